@@ -3,6 +3,10 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The server-sent events stream (``/api/events/``) is an async view and should
+be served through this application (e.g. ``uvicorn config.asgi:application``)
+so that each idle client costs a coroutine instead of a worker thread.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -66,6 +66,11 @@ urlpatterns = [
         name="conversation_detail",
     ),
     path("api/", include(router.urls)),
+    path("api/export/<str:dataset>/", api_views.export_view, name="export-data"),
+    path("api/messages/unread/", api_views.unread_messages_view, name="unread-messages"),
+    path("api/messages/search/", api_views.message_search_view, name="message-search"),
+    path("api/events/", views.event_stream_view, name="event-stream"),
+    path("api/admin/db-pool/", api_views.db_pool_view, name="db-pool-stats"),
 
     ##new urls for frontend.
     path('api/auth/signup/', api_views.signup_view),
@@ -74,7 +79,12 @@ urlpatterns = [
     path('api/auth/me/', api_views.me_view),
     path('api/auth/forgot-password/', api_views.forgot_password_view),
     path('api/auth/reset-password/', api_views.reset_password_view),
+    path('api/auth/verify-email/', api_views.verify_email_view),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(
+        settings.MEDIA_URL,
+        view=views.media_view,
+        document_root=settings.MEDIA_ROOT,
+    )
@@ -1,9 +1,13 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.utils import timezone
 from .models import (
-    User, Profile, Listing, ListingImage, Conversation, Message,
-    Review, BlockReview, Report, BlockedUser, MatchCompatibility, Notification
+    User, Profile, Listing, ListingImage, MediaBlob, Conversation, Message, ArchivedMessage,
+    Review, BlockReview, Report, BlockedUser, MatchCompatibility, ListingRecommendation, Notification,
+    OutboundEmail, UserToken
 )
+from .utils.message_search import filter_messages
+from .utils.ratelimit import LOGIN_LIMITS, ratelimit
 
 
 @admin.register(User)
@@ -16,7 +20,7 @@ class UserAdmin(BaseUserAdmin):
     fieldsets = (
         (None, {"fields": ("email", "username", "password")}),
         ("Personal Info", {"fields": ("first_name", "last_name")}),
-        ("User Type", {"fields": ("user_type", "is_verified", "verification_token")}),
+        ("User Type", {"fields": ("user_type", "is_verified")}),
         ("Permissions", {"fields": ("is_active", "is_staff", "is_superuser", "groups", "user_permissions")}),
         ("Important Dates", {"fields": ("last_login", "date_joined")}),
     )
@@ -63,6 +67,13 @@ class ListingImageAdmin(admin.ModelAdmin):
     search_fields = ("listing__title",)
 
 
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ("name", "ref_count", "created_at")
+    search_fields = ("name",)
+    readonly_fields = ("name", "ref_count", "created_at")
+
+
 @admin.register(Conversation)
 class ConversationAdmin(admin.ModelAdmin):
     list_display = ("conversation_id", "user1", "user2", "last_message_at", "created_at")
@@ -74,9 +85,24 @@ class ConversationAdmin(admin.ModelAdmin):
 class MessageAdmin(admin.ModelAdmin):
     list_display = ("message_id", "sender", "receiver", "conversation", "is_read", "sent_at")
     list_filter = ("is_read", "sent_at")
-    search_fields = ("sender__email", "receiver__email", "message_text")
+    # Message text is matched through the full-text index in get_search_results.
+    search_fields = ("sender__email", "receiver__email")
     readonly_fields = ("sent_at", "read_at")
 
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            results |= filter_messages(queryset, search_term)
+        return results, may_have_duplicates
+
+
+@admin.register(ArchivedMessage)
+class ArchivedMessageAdmin(admin.ModelAdmin):
+    list_display = ("message_id", "sender", "receiver", "conversation", "sent_at", "archived_at")
+    list_filter = ("sent_at",)
+    search_fields = ("sender__email", "receiver__email")
+    readonly_fields = [field.name for field in ArchivedMessage._meta.fields]
+
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
@@ -118,10 +144,48 @@ class MatchCompatibilityAdmin(admin.ModelAdmin):
     list_filter = ("compatibility_score",)
 
 
+@admin.register(ListingRecommendation)
+class ListingRecommendationAdmin(admin.ModelAdmin):
+    list_display = ("recommendation_id", "user", "listing", "score", "calculated_at")
+    search_fields = ("user__email", "user__username", "listing__title")
+    readonly_fields = ("calculated_at",)
+    raw_id_fields = ("user", "listing")
+
+
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ("notification_id", "user", "notification_type", "is_read", "created_at")
     list_filter = ("notification_type", "is_read", "created_at")
     search_fields = ("user__email", "user__username", "content")
     list_editable = ("is_read",)
-    readonly_fields = ("created_at",)
\ No newline at end of file
+    readonly_fields = ("created_at",)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("email_id", "subject", "status", "attempts", "next_attempt_at", "created_at", "sent_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("subject",)
+    readonly_fields = ("created_at", "sent_at", "last_error")
+    actions = ["retry_emails"]
+
+    @admin.action(description="Retry selected e-mails")
+    def retry_emails(self, request, queryset):
+        updated = queryset.exclude(status=OutboundEmail.Status.SENT).update(
+            status=OutboundEmail.Status.PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} e-mails queued for retry.")
+
+
+@admin.register(UserToken)
+class UserTokenAdmin(admin.ModelAdmin):
+    list_display = ("token_id", "user", "purpose", "expires_at", "used_at", "created_at")
+    list_filter = ("purpose",)
+    search_fields = ("user__email",)
+    readonly_fields = ("token_hash", "created_at", "used_at")
+
+
+# The admin login runs the same password check as the site's login forms.
+admin.site.login = ratelimit("login", LOGIN_LIMITS)(admin.site.login)
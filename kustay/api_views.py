@@ -1,20 +1,36 @@
+import io
+import itertools
 from decimal import Decimal, InvalidOperation
 
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib.auth import authenticate, login as django_login, logout as django_logout
-from django.core.mail import send_mail
-from django.utils.crypto import get_random_string
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
+from django.views.decorators.http import require_GET
 from datetime import timedelta
 
 from rest_framework import permissions, viewsets
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
-from .models import Listing, User
-from .serializers import ListingSerializer
+from .models import Listing, Profile, User, UserToken
+from .serializers import ListingSerializer, resolve_listing_fields
+from .utils.db_pool import pool_stats
+from .utils.export import EXPORT_DATASETS, EXPORT_FORMATS, iter_export_rows, render_export
+from .utils.listing_import import IMPORT_FORMATS, detect_format, import_listings, parse_rows
+from .utils.message_search import DEFAULT_PAGE_SIZE, search_messages
+from .utils.outbound_email import enqueue_email
+from .utils.ratelimit import LOGIN_LIMITS, ratelimit
+from .utils.recommendations import RECOMMENDATIONS_PER_USER, get_recommendations
+from .utils.read_state import unread_counts
+from .utils.tokens import consume_token, issue_token, token_lookup
 
 import re
 
@@ -27,10 +43,108 @@ class ListingViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        """
+        Imports many listings for the requesting user from an uploaded CSV or
+        NDJSON ``file``. Valid rows are created; the response lists the errors
+        of every rejected row. Uploads are capped at ``LISTING_IMPORT_MAX_BYTES``
+        and ``LISTING_IMPORT_MAX_ROWS``; larger files go through the
+        ``import_listings`` management command.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "Upload a CSV or NDJSON file as 'file'."}, status=400)
+
+        too_large = {
+            "error": (
+                f"Upload at most {settings.LISTING_IMPORT_MAX_ROWS} rows "
+                f"({settings.LISTING_IMPORT_MAX_BYTES} bytes) per request; "
+                "ask an administrator to run the import_listings command for larger files."
+            )
+        }
+        if upload.size > settings.LISTING_IMPORT_MAX_BYTES:
+            return Response(too_large, status=413)
+
+        import_format = request.data.get("input_format") or detect_format(upload.name)
+        if import_format not in IMPORT_FORMATS:
+            return Response({"error": "Unsupported format"}, status=400)
+
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        # Parsed up front so an oversized file is rejected before anything is written.
+        limit = settings.LISTING_IMPORT_MAX_ROWS
+        rows = list(itertools.islice(parse_rows(stream, import_format), limit + 1))
+        if len(rows) > limit:
+            return Response(too_large, status=413)
+        report = import_listings(
+            rows,
+            request.user,
+            dry_run=dry_run,
+        )
+        status = 201 if report["created"] and not dry_run else 200
+        return Response(report, status=status)
+
+    @action(detail=False, methods=["get"], url_path="recommended", permission_classes=[IsAuthenticated])
+    def recommended(self, request):
+        """
+        The requesting user's precomputed listing recommendations, best first,
+        each with its score and breakdown. Supports the same sparse fieldsets
+        as the list endpoint.
+        """
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), RECOMMENDATIONS_PER_USER))
+        except (TypeError, ValueError):
+            limit = 20
+
+        fields = self.get_requested_fields()
+        recommendations = get_recommendations(request.user, limit=limit)
+        if fields is None or "images" in fields:
+            recommendations = recommendations.prefetch_related("listing__images")
+        recommendations = list(recommendations)
+        if not recommendations and not Profile.objects.filter(user=request.user).exists():
+            return Response({"detail": "Complete your profile to get listing recommendations."}, status=400)
+
+        serializer = self.get_serializer([rec.listing for rec in recommendations], many=True)
+        results = [
+            {"listing": data, "score": float(rec.score), "criteria": rec.criteria}
+            for rec, data in zip(recommendations, serializer.data)
+        ]
+        return Response({"results": results, "count": len(results)})
+
+    def get_requested_fields(self):
+        """
+        Sparse fieldset for read requests (``?view=card``, ``?fields=``, ``?omit=``).
+        Writes always use the full representation.
+        """
+        if self.request.method not in permissions.SAFE_METHODS:
+            return None
+        return resolve_listing_fields(self.request.query_params)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
     def get_queryset(self):
         queryset = super().get_queryset()
         queryset = queryset.filter(is_active=True)
 
+        fields = self.get_requested_fields()
+        if fields is None:
+            queryset = queryset.prefetch_related("images")
+        else:
+            # Narrow the SELECT to the columns the serializer will render.
+            columns = [
+                name for name in fields if name not in ("user", "images")
+            ]
+            if "user" in fields:
+                columns += ["user", "user__email"]
+            else:
+                queryset = queryset.select_related(None)
+            if "images" in fields:
+                queryset = queryset.prefetch_related("images")
+            queryset = queryset.only(*columns)
+
         location = self.request.query_params.get("location", "").strip()
         price_min = self.request.query_params.get("price_min", "").strip()
         price_max = self.request.query_params.get("price_max", "").strip()
@@ -63,8 +177,49 @@ class ListingViewSet(viewsets.ModelViewSet):
         return queryset
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_view(request, dataset):
+    """
+    Admin-only streaming snapshot of a table (?output=ndjson|csv). Pass
+    ?after=<last exported pk> to resume an interrupted download.
+    """
+    if dataset not in EXPORT_DATASETS:
+        return Response({'error': 'Unknown dataset'}, status=404)
+
+    # ``format`` is reserved by DRF for renderer negotiation.
+    export_format = request.query_params.get('output', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return Response({'error': 'Unsupported format'}, status=400)
+
+    try:
+        after = request.query_params.get('after')
+        after = int(after) if after else None
+        limit = request.query_params.get('limit')
+        limit = int(limit) if limit else None
+    except ValueError:
+        return Response({'error': 'after and limit must be integers'}, status=400)
+
+    rows = iter_export_rows(dataset, after=after, limit=limit)
+    content_type = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(
+        render_export(dataset, export_format, rows),
+        content_type=f'{content_type}; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{export_format}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_pool_view(request):
+    """Admin-only connection pool metrics of this worker process."""
+    return Response(pool_stats())
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@ratelimit('signup', [('ip', '10/h')])
 def signup_view(request):
     email = request.data.get('email')
     username = request.data.get('username')
@@ -78,23 +233,27 @@ def signup_view(request):
                 'error': 'KU Students must use their KU email address (@ku.edu.tr)'
             }, status=400)
     
-    if User.objects.filter(email=email).exists():
-        return Response({'error': 'Email already registered'}, status=400)
-    
-    if User.objects.filter(username=username).exists():
-        return Response({'error': 'Username already taken'}, status=400)
-    
-    user = User.objects.create_user(
-        email=email,
-        username=username,
-        password=password,
-        user_type=user_type
-    )
-    
-    # Send verification email
-    if user_type == 'KU_Student':
-        send_verification_email(user)
-    
+    # One transaction: the unique constraints on email and username reject
+    # duplicates (no check-then-insert race), and the user, verification token
+    # and queued email are committed together or not at all.
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(
+                email=email,
+                username=username,
+                password=password,
+                user_type=user_type
+            )
+
+            # Send verification email
+            if user_type == 'KU_Student':
+                send_verification_email(user, replace_tokens=False)
+    except IntegrityError as exc:
+        field = _unique_violation_field(exc)
+        if field is None:
+            raise
+        return Response({'error': SIGNUP_CONFLICT_ERRORS[field], 'field': field}, status=400)
+
     django_login(request, user)
     
     return Response({
@@ -108,24 +267,38 @@ def signup_view(request):
     })
 
 
-def send_verification_email(user):
+SIGNUP_CONFLICT_ERRORS = {
+    'email': 'Email already registered',
+    'username': 'Username already taken',
+}
+
+
+def _unique_violation_field(exc):
+    """Which signup field a unique-constraint violation was raised for."""
+    diag = getattr(exc.__cause__, 'diag', None)
+    constraint = getattr(diag, 'constraint_name', None) or str(exc)
+    for field in SIGNUP_CONFLICT_ERRORS:
+        if field in constraint:
+            return field
+    return None
+
+
+def send_verification_email(user, replace_tokens=True):
     """Send email verification to KU students"""
-    verification_token = get_random_string(64)
-    user.verification_token = verification_token
-    user.save()
-    
+    verification_token = issue_token(user, UserToken.Purpose.VERIFY_EMAIL, replace=replace_tokens)
+
     verify_url = f"http://localhost:3000/verify-email?token={verification_token}"
     
-    send_mail(
+    enqueue_email(
         'Verify Your KUstay Account',
         f'Click to verify: {verify_url}',
-        'noreply@kustay.com',
         [user.email],
     )
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@ratelimit('login', LOGIN_LIMITS)
 def login_view(request):
     email = request.data.get('email')
     password = request.data.get('password')
@@ -157,11 +330,13 @@ def logout_view(request):
         return Response({'error': str(e)}, status=500)
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def me_view(request):
-    user = request.user
-    return Response({
+@require_GET
+async def me_view(request):
+    """Async so session checks from the frontend never wait for a worker thread."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=403)
+    return JsonResponse({
         'user': {
             'id': user.pk,
             'email': user.email,
@@ -172,8 +347,41 @@ def me_view(request):
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def unread_messages_view(request):
+    """Unread message counts for all of the user's conversations in one query."""
+    counts = unread_counts(request.user)
+    return Response({
+        'total': sum(counts.values()),
+        'conversations': [
+            {'conversation_id': conversation_id, 'unread': unread}
+            for conversation_id, unread in sorted(counts.items())
+        ],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def message_search_view(request):
+    """Full-text search across the user's own conversations."""
+    term = request.query_params.get('q', '').strip()
+    if not term:
+        return Response({'error': 'q is required.'}, status=400)
+    try:
+        cursor = request.query_params.get('cursor')
+        cursor = int(cursor) if cursor else None
+        limit = int(request.query_params.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return Response({'error': 'cursor and limit must be integers.'}, status=400)
+
+    results, next_cursor = search_messages(request.user, term, before=cursor, limit=limit)
+    return Response({'results': results, 'next_cursor': next_cursor})
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@ratelimit('forgot-password', [('ip', '10/h'), ('email', '3/h')])
 def forgot_password_view(request):
     email = request.data.get('email')
     
@@ -181,20 +389,16 @@ def forgot_password_view(request):
         user = User.objects.get(email=email)
         
         # Generate reset token
-        reset_token = get_random_string(64)
-        user.verification_token = reset_token
-        user.save()
-        
+        reset_token = issue_token(user, UserToken.Purpose.PASSWORD_RESET)
+
         # Create reset URL
         reset_url = f"http://localhost:3000/reset-password?token={reset_token}"
         
-        # Send email
-        send_mail(
+        # Queue email; delivery happens off the request path.
+        enqueue_email(
             'Password Reset Request',
             f'Click the link to reset your password: {reset_url}\n\nThis link expires in 1 hour.',
-            'noreply@kustay.com',
             [email],
-            fail_silently=False,
         )
         
         return Response({'message': 'Reset email sent'}, status=200)
@@ -211,16 +415,40 @@ def reset_password_view(request):
     token = request.data.get('token')
     password = request.data.get('password')
     
+    if not password:
+        return Response({'error': 'Password is required'}, status=400)
+
+    pending = None
+    if token:
+        pending = token_lookup(token, UserToken.Purpose.PASSWORD_RESET).select_related('user').first()
+    if pending is None:
+        return Response({'error': 'Invalid or expired token'}, status=400)
     try:
-        user = User.objects.get(verification_token=token)
-        
-        # Set new password
-        user.set_password(password)
-        user.verification_token = ''  # Clear the token
-        user.save()
-        
+        validate_password(password, user=pending.user)
+    except ValidationError as e:
+        return Response({'error': ' '.join(e.messages)}, status=400)
+
+    try:
+        # The token is only spent if the new password is saved too.
+        with transaction.atomic():
+            user = consume_token(token, UserToken.Purpose.PASSWORD_RESET)
+            if user is None:
+                return Response({'error': 'Invalid or expired token'}, status=400)
+            user.set_password(password)
+            user.save(update_fields=['password'])
+
         return Response({'message': 'Password reset successfully'}, status=200)
-    except User.DoesNotExist:
-        return Response({'error': 'Invalid or expired token'}, status=400)
     except Exception as e:
-        return Response({'error': str(e)}, status=500)
\ No newline at end of file
+        return Response({'error': str(e)}, status=500)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def verify_email_view(request):
+    user = consume_token(request.data.get('token'), UserToken.Purpose.VERIFY_EMAIL)
+    if user is None:
+        return Response({'error': 'Invalid or expired token'}, status=400)
+
+    user.is_verified = True
+    user.save(update_fields=['is_verified'])
+    return Response({'message': 'Email verified'}, status=200)
\ No newline at end of file
@@ -0,0 +1,23 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+from .utils.user_cache import get_cached_user
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` whose per-request user lookup (the one behind
+    ``request.user``) is served from the user cache, profile included.
+    Without a shared cache (``USER_CACHE_ENABLED``) it behaves like
+    ``ModelBackend``.
+    """
+
+    def get_user(self, user_id):
+        if not settings.USER_CACHE_ENABLED:
+            return super().get_user(user_id)
+        user = get_cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        return await sync_to_async(self.get_user)(user_id)
@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def fragment_cache(request):
+    """Timeout for ``{% cache %}`` fragments, so templates need not hardcode it."""
+    return {"FRAGMENT_CACHE_TIMEOUT": settings.TEMPLATE_FRAGMENT_CACHE_TIMEOUT}
@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from kustay.utils.message_archive import (
+    DEFAULT_ARCHIVE_AFTER_DAYS,
+    DEFAULT_BATCH_SIZE,
+    archive_messages,
+)
+
+
+class Command(BaseCommand):
+    help = "Move messages older than the hot window into the message archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=DEFAULT_ARCHIVE_AFTER_DAYS,
+            help="Archive messages sent more than this many days ago.",
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many messages would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["older_than_days"])
+        moved = archive_messages(
+            cutoff,
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {moved} messages sent before {cutoff:%Y-%m-%d}.")
+        )
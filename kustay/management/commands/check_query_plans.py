@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from kustay.utils.benchmark import benchmark_users, seed_benchmark_data
+from kustay.utils.query_plans import HOT_QUERIES, build_sample, find_sequential_scans
+
+
+class Command(BaseCommand):
+    help = "Fail if any registered hot query is planned with a sequential scan on the benchmark dataset."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", action="store_true", help="Seed the benchmark dataset first if missing.")
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every plan, not only failures.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Query plan checks require PostgreSQL.")
+
+        if options["seed"]:
+            created = seed_benchmark_data()
+            if created:
+                self.stdout.write(f"Seeded benchmark data: {created}")
+        if not benchmark_users().exists():
+            raise CommandError("No benchmark data found; run with --seed.")
+
+        sample = build_sample()
+        failures = []
+        for name, build_query in sorted(HOT_QUERIES.items()):
+            queryset = build_query(sample)
+            scans = find_sequential_scans(queryset)
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"SEQ SCAN {name}: {', '.join(scans)}"))
+                self.stdout.write(queryset.explain())
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok       {name}"))
+                if options["verbose_plans"]:
+                    self.stdout.write(queryset.explain())
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries use sequential scans: {', '.join(failures)}")
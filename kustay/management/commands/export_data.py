@@ -0,0 +1,75 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand
+
+from kustay.utils.export import (
+    DEFAULT_CHUNK_SIZE,
+    EXPORT_DATASETS,
+    EXPORT_FORMATS,
+    iter_export_rows,
+    render_export,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream a table snapshot as NDJSON or CSV in primary-key order."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(EXPORT_DATASETS))
+        parser.add_argument("--format", dest="export_format", choices=EXPORT_FORMATS, default="ndjson")
+        parser.add_argument(
+            "--after",
+            type=int,
+            default=None,
+            help="Resume after this primary key (the last one a previous run wrote).",
+        )
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many rows.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write to; appends when resuming. Defaults to stdout.",
+        )
+
+    def handle(self, *args, **options):
+        dataset = options["dataset"]
+        pk_name = EXPORT_DATASETS[dataset]["model"]._meta.pk.attname
+        state = {"count": 0, "cursor": options["after"]}
+
+        def tracked(rows):
+            for row in rows:
+                state["count"] += 1
+                state["cursor"] = row[pk_name]
+                yield row
+
+        rows = tracked(
+            iter_export_rows(
+                dataset,
+                after=options["after"],
+                limit=options["limit"],
+                chunk_size=options["chunk_size"],
+            )
+        )
+        export_format = options["export_format"]
+        output = options["output"]
+        if output == "-":
+            self._write(sys.stdout, render_export(dataset, export_format, rows))
+        else:
+            resuming = options["after"] is not None and os.path.exists(output)
+            with open(output, "a" if resuming else "w", encoding="utf-8", newline="") as handle:
+                chunks = render_export(dataset, export_format, rows)
+                if resuming and handle.tell() and export_format == "csv":
+                    next(chunks)  # the header was written by the first run
+                self._write(handle, chunks)
+
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"Exported {state['count']} {dataset} rows; resume with --after {state['cursor']}."
+            )
+        )
+
+    @staticmethod
+    def _write(handle, chunks):
+        for chunk in chunks:
+            handle.write(chunk)
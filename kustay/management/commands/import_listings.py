@@ -0,0 +1,52 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from kustay.utils.listing_import import (
+    DEFAULT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    detect_format,
+    import_listings,
+    parse_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Bulk import listings from a CSV or NDJSON file, validated like the listing form."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file to import.")
+        parser.add_argument("--owner", required=True, help="Email of the user who will own the listings.")
+        parser.add_argument("--format", dest="import_format", choices=IMPORT_FORMATS, default=None)
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Validate only; write nothing.")
+        parser.add_argument("--report", default=None, help="Write the per-row error report to this JSON file.")
+
+    def handle(self, *args, **options):
+        UserModel = get_user_model()
+        try:
+            owner = UserModel.objects.get(email=options["owner"])
+        except UserModel.DoesNotExist as exc:
+            raise CommandError(f"No user with email {options['owner']}.") from exc
+
+        import_format = options["import_format"] or detect_format(options["path"])
+        with open(options["path"], encoding="utf-8-sig", newline="") as handle:
+            report = import_listings(
+                parse_rows(handle, import_format),
+                owner,
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2)
+        else:
+            for entry in report["errors"]:
+                self.stderr.write(f"Row {entry['row']}: {json.dumps(entry['errors'])}")
+
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {report['created']} listings; rejected {report['rejected']} rows.")
+        )
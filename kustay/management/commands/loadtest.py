@@ -0,0 +1,72 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kustay.utils.benchmark import benchmark_users, seed_benchmark_data
+from kustay.utils.loadtest import ENDPOINTS, load_test_data, run_load_test
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive a weighted mix of browse, search, match and messaging requests against a "
+        "running server as benchmark users and report per-endpoint RPS, errors and latency as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Server to test.")
+        parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users.")
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run after login.")
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=0.0,
+            help="Mean pause between a user's requests in seconds (0 = back to back).",
+        )
+        parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+        parser.add_argument("--seed", action="store_true", help="Seed the benchmark dataset first if missing.")
+        parser.add_argument("--random-seed", type=int, default=491, help="Seed of the request mix.")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["duration"] <= 0:
+            raise CommandError("--users and --duration must be positive.")
+
+        if options["seed"]:
+            created = seed_benchmark_data()
+            if created:
+                self.stderr.write(f"Seeded benchmark data: {created}")
+        if not benchmark_users().exists():
+            raise CommandError("No benchmark data found; run with --seed.")
+
+        data, users = load_test_data(options["users"])
+        if len(users) < options["users"]:
+            raise CommandError(f"Only {len(users)} benchmark users exist.")
+
+        self.stderr.write(
+            f"Running {len(ENDPOINTS)} endpoints with {len(users)} users for "
+            f"{options['duration']:g}s against {options['base_url']}..."
+        )
+        report = run_load_test(
+            options["base_url"],
+            users,
+            data,
+            duration=options["duration"],
+            think_time=options["think_time"],
+            timeout=options["timeout"],
+            seed=options["random_seed"],
+        )
+
+        rendered = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(rendered + "\n")
+            total = report["total"]
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{total['requests']} requests, {total['rps']} req/s, "
+                    f"p95 {total['latency_ms']['p95']} ms, error rate {total['error_rate']:.2%}. "
+                    f"Report written to {options['output']}."
+                )
+            )
+        else:
+            self.stdout.write(rendered)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from kustay.models import Listing
+from kustay.utils.images import needs_processing, process_listing_image
+
+
+class Command(BaseCommand):
+    help = "Build resized image variants for listings whose variants are missing or stale."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild variants even when they look current.",
+        )
+
+    def handle(self, *args, **options):
+        listings = Listing.objects.only("listing_id", "image", "image_variants")
+        if options["force"]:
+            Listing.objects.update(image_variants={})
+            listings = listings.exclude(image="").exclude(image__isnull=True)
+
+        processed = 0
+        for listing in listings.iterator():
+            if needs_processing(listing):
+                if process_listing_image(listing.pk):
+                    processed += 1
+        self.stdout.write(self.style.SUCCESS(f"Processed images for {processed} listings."))
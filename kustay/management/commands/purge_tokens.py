@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from kustay.utils.tokens import purge_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired verification and password reset tokens."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--used-older-than-hours",
+            type=int,
+            default=24,
+            help="Also delete tokens that were used more than this many hours ago.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = purge_tokens(timedelta(hours=options["used_older_than_hours"]))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tokens."))
@@ -1,11 +1,27 @@
-from django.core.management.base import BaseCommand
+from contextlib import nullcontext
 
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from kustay.routers import read_from
 from kustay.utils.matching import calculate_all_matches
 
 
 class Command(BaseCommand):
     help = "Recalculate compatibility scores for all verified profiles."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--read-from",
+            metavar="ALIAS",
+            help="Database alias (e.g. replica1) to read profiles from; results are written to the primary.",
+        )
+
     def handle(self, *args, **options):
-        total = calculate_all_matches()
+        alias = options["read_from"]
+        if alias and alias not in settings.DATABASES:
+            raise CommandError(f"Unknown database alias {alias!r}.")
+
+        with read_from(alias) if alias else nullcontext():
+            total = calculate_all_matches()
         self.stdout.write(self.style.SUCCESS(f"Recomputed {total} match entries."))
@@ -0,0 +1,27 @@
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from kustay.routers import read_from
+from kustay.utils.recommendations import recompute_all_recommendations
+
+
+class Command(BaseCommand):
+    help = "Rebuild every user's stored listing recommendations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--read-from",
+            metavar="ALIAS",
+            help="Database alias (e.g. replica1) to read profiles and listings from; results are written to the primary.",
+        )
+
+    def handle(self, *args, **options):
+        alias = options["read_from"]
+        if alias and alias not in settings.DATABASES:
+            raise CommandError(f"Unknown database alias {alias!r}.")
+
+        with read_from(alias) if alias else nullcontext():
+            total = recompute_all_recommendations()
+        self.stdout.write(self.style.SUCCESS(f"Stored {total} listing recommendations."))
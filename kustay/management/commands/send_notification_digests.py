@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from kustay.utils.notifications import DIGEST_BATCH_SIZE, send_notification_digests
+
+
+class Command(BaseCommand):
+    help = "Queue an e-mail digest of unread notifications for each user."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age-minutes",
+            type=int,
+            default=60,
+            help="Skip notifications younger than this; they may still be read in the app.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DIGEST_BATCH_SIZE,
+            help="Digests queued per insert.",
+        )
+
+    def handle(self, *args, **options):
+        queued, included = send_notification_digests(
+            older_than=timedelta(minutes=options["min_age_minutes"]),
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Queued {queued} digests covering {included} notifications.")
+        )
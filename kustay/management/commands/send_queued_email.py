@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from kustay.utils.outbound_email import DEFAULT_BATCH_SIZE, send_queued_email
+
+
+class Command(BaseCommand):
+    help = "Deliver queued e-mail, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll for new mail.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=10.0,
+            help="Seconds between polls with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            totals = send_queued_email(batch_size=options["batch_size"])
+            if any(totals.values()):
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Sent {totals['sent']}, retrying {totals['retried']}, dead {totals['dead']}."
+                    )
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
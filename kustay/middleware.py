@@ -0,0 +1,51 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+from .routers import routing_scope
+
+PRIMARY_COOKIE = "kustay_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@sync_and_async_middleware
+def read_your_writes_middleware(get_response):
+    """
+    Routes a request's reads to the primary when it is unsafe or follows a
+    write by the same client within ``READ_YOUR_WRITES_SECONDS``; requests
+    that write set a short-lived cookie to pin the next ones.
+    """
+
+    def pin_primary(request) -> bool:
+        return request.method not in SAFE_METHODS or PRIMARY_COOKIE in request.COOKIES
+
+    def remember_write(response, state):
+        if state.wrote and settings.READ_YOUR_WRITES_SECONDS:
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                "1",
+                max_age=settings.READ_YOUR_WRITES_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            if not settings.REPLICA_DATABASES:
+                return await get_response(request)
+            with routing_scope(primary=pin_primary(request)) as state:
+                response = await get_response(request)
+            return remember_write(response, state)
+
+    else:
+
+        def middleware(request):
+            if not settings.REPLICA_DATABASES:
+                return get_response(request)
+            with routing_scope(primary=pin_primary(request)) as state:
+                response = get_response(request)
+            return remember_write(response, state)
+
+    return middleware
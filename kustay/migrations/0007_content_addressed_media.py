@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:36
+
+import kustay.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kustay", "0006_listing_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="listingimage",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=kustay.storage.listing_media_storage,
+                upload_to="listing_images/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="listing",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=kustay.storage.listing_media_storage,
+                upload_to="listing_images/",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="listingimage",
+            name="image_url",
+            field=models.URLField(blank=True),
+        ),
+    ]
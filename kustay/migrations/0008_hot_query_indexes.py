@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kustay", "0007_content_addressed_media"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-created_at"],
+                name="listing_active_recent_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["rent_amount", "-created_at"],
+                name="listing_active_rent_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="matchcompatibility",
+            index=models.Index(
+                fields=["user1", "-compatibility_score"], name="match_user1_score_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="matchcompatibility",
+            index=models.Index(
+                fields=["user2", "-compatibility_score"], name="match_user2_score_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["conversation", "sent_at"], name="message_conversation_sent_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                condition=models.Q(("is_read", False)),
+                fields=["receiver", "conversation"],
+                name="message_unread_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "-created_at"], name="notification_user_recent_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", False)),
+                fields=["user", "-created_at"],
+                name="notification_unread_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_user_matches(apps, schema_editor):
+    MatchCompatibility = apps.get_model("kustay", "MatchCompatibility")
+    UserMatch = apps.get_model("kustay", "UserMatch")
+
+    batch = []
+    rows = MatchCompatibility.objects.values_list(
+        "match_id", "user1_id", "user2_id", "compatibility_score", "calculated_at"
+    )
+    for match_id, user1_id, user2_id, score, calculated_at in rows.iterator(
+        chunk_size=2000
+    ):
+        for user_id, partner_id in ((user1_id, user2_id), (user2_id, user1_id)):
+            batch.append(
+                UserMatch(
+                    user_id=user_id,
+                    partner_id=partner_id,
+                    match_id=match_id,
+                    compatibility_score=score,
+                    calculated_at=calculated_at,
+                )
+            )
+        if len(batch) >= 4000:
+            UserMatch.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        UserMatch.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kustay", "0008_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserMatch",
+            fields=[
+                (
+                    "user_match_id",
+                    models.BigAutoField(primary_key=True, serialize=False),
+                ),
+                (
+                    "compatibility_score",
+                    models.DecimalField(decimal_places=2, max_digits=5),
+                ),
+                ("calculated_at", models.DateTimeField()),
+                (
+                    "match",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="directed",
+                        to="kustay.matchcompatibility",
+                    ),
+                ),
+                (
+                    "partner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="directed_matches",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-compatibility_score", "-calculated_at"],
+                        name="usermatch_user_top_idx",
+                    )
+                ],
+                "unique_together": {("user", "partner")},
+            },
+        ),
+        migrations.RunPython(backfill_user_matches, migrations.RunPython.noop),
+    ]
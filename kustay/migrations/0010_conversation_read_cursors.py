@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:51
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_read_cursors(apps, schema_editor):
+    Conversation = apps.get_model("kustay", "Conversation")
+    Message = apps.get_model("kustay", "Message")
+
+    for participant in ("user1", "user2"):
+        last_read = (
+            Message.objects.filter(
+                conversation=OuterRef("pk"),
+                receiver=OuterRef(participant),
+                is_read=True,
+            )
+            .order_by()
+            .values("conversation")
+            .annotate(last=Max("message_id"))
+            .values("last")
+        )
+        Conversation.objects.update(
+            **{
+                f"{participant}_last_read_message_id": Coalesce(
+                    Subquery(last_read), Value(0)
+                )
+            }
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kustay", "0009_user_match"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="user1_last_read_message_id",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="user2_last_read_message_id",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["receiver", "conversation", "message_id"],
+                name="message_receiver_cursor_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_read_cursors, migrations.RunPython.noop),
+    ]
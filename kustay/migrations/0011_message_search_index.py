@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:52
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kustay", "0010_conversation_read_cursors"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "message_text", config="simple"
+                ),
+                name="message_text_search_idx",
+            ),
+        ),
+    ]
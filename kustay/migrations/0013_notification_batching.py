@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kustay", "0012_archived_message"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="emailed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="event_count",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("emailed_at__isnull", True), ("is_read", False)),
+                fields=["user", "notification_id"],
+                name="notification_digest_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kustay", "0015_user_token"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ListingRecommendation",
+            fields=[
+                (
+                    "recommendation_id",
+                    models.BigAutoField(primary_key=True, serialize=False),
+                ),
+                ("score", models.DecimalField(decimal_places=2, max_digits=5)),
+                ("criteria", models.JSONField(blank=True, default=dict)),
+                ("calculated_at", models.DateTimeField()),
+                (
+                    "listing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendations",
+                        to="kustay.listing",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="listing_recommendations",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-score", "-calculated_at"],
+                        name="listingrec_user_top_idx",
+                    )
+                ],
+                "unique_together": {("user", "listing")},
+            },
+        ),
+    ]
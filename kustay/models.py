@@ -1,6 +1,15 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+
+from .storage import listing_media_storage
+
+# "simple" keeps search language-agnostic (messages mix Turkish and English).
+MESSAGE_SEARCH_CONFIG = "simple"
+MESSAGE_SEARCH_VECTOR = SearchVector("message_text", config=MESSAGE_SEARCH_CONFIG)
 
 
 class User(AbstractUser):
@@ -13,7 +22,6 @@ class User(AbstractUser):
     email = models.EmailField(unique=True)
     user_type = models.CharField(max_length=20, choices=USER_TYPE_CHOICES)
     is_verified = models.BooleanField(default=False)
-    verification_token = models.CharField(max_length=255, blank=True, null=True)
     last_login = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -140,16 +148,45 @@ class Listing(models.Model):
     amenities = models.JSONField(default=list, blank=True)
     house_rules = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
-    image = models.ImageField(upload_to="listing_images/", null=True, blank=True)
+    image = models.ImageField(
+        upload_to="listing_images/",
+        storage=listing_media_storage,
+        null=True,
+        blank=True,
+    )
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Browse pages only ever show active listings, newest first,
+            # optionally narrowed by a rent range.
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(is_active=True),
+                name="listing_active_recent_idx",
+            ),
+            models.Index(
+                fields=["rent_amount", "-created_at"],
+                condition=models.Q(is_active=True),
+                name="listing_active_rent_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} (#{self.listing_id})"
 
+    @property
+    def image_variant_urls(self):
+        """Resized renditions keyed by variant name (thumb/card/full)."""
+        from .utils.images import variant_urls
+
+        return variant_urls(self.image_variants)
+
 
 class Review(models.Model):
     class ModerationStatus(models.TextChoices):
@@ -196,7 +233,13 @@ class ListingImage(models.Model):
         on_delete=models.CASCADE,
         related_name="images",
     )
-    image_url = models.URLField()
+    image_url = models.URLField(blank=True)
+    image = models.ImageField(
+        upload_to="listing_images/",
+        storage=listing_media_storage,
+        null=True,
+        blank=True,
+    )
     is_primary = models.BooleanField(default=False)
     upload_date = models.DateTimeField(auto_now_add=True)
 
@@ -206,6 +249,16 @@ class ListingImage(models.Model):
     def __str__(self):
         return f"Image for {self.listing.title}"
 
+class MediaBlob(models.Model):
+    """Reference count for a content-addressed file in listing media storage."""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
 class Conversation(models.Model):
     conversation_id = models.BigAutoField(primary_key=True)
     user1 = models.ForeignKey(
@@ -219,6 +272,10 @@ class Conversation(models.Model):
         related_name="conversations_as_user2",
     )
     last_message_at = models.DateTimeField(null=True, blank=True)
+    # Read cursors: the highest message id each participant has seen. Messages
+    # received after a participant's cursor are unread for them.
+    user1_last_read_message_id = models.BigIntegerField(default=0)
+    user2_last_read_message_id = models.BigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -228,6 +285,14 @@ class Conversation(models.Model):
     def __str__(self):
         return f"Conversation between {self.user1} and {self.user2}"
 
+    def last_read_field(self, user) -> str:
+        """Name of the read-cursor field belonging to ``user``."""
+        if user.pk == self.user1_id:
+            return "user1_last_read_message_id"
+        if user.pk == self.user2_id:
+            return "user2_last_read_message_id"
+        raise ValueError("User is not part of this conversation.")
+
 class Message(models.Model):
     message_id = models.BigAutoField(primary_key=True)
     sender = models.ForeignKey(
@@ -259,9 +324,71 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["-sent_at"]
+        indexes = [
+            # Conversation threads and "last message" lookups.
+            models.Index(fields=["conversation", "sent_at"], name="message_conversation_sent_idx"),
+            # Unread messages per receiver; read messages are the vast majority.
+            models.Index(
+                fields=["receiver", "conversation"],
+                condition=models.Q(is_read=False),
+                name="message_unread_idx",
+            ),
+            # Unread counts compare message ids against conversation read cursors.
+            models.Index(
+                fields=["receiver", "conversation", "message_id"],
+                name="message_receiver_cursor_idx",
+            ),
+            # Full-text search; queries must use MESSAGE_SEARCH_VECTOR verbatim.
+            GinIndex(MESSAGE_SEARCH_VECTOR, name="message_text_search_idx"),
+        ]
 
     def __str__(self):
         return f"Message from {self.sender} to {self.receiver}"
+
+
+class ArchivedMessage(models.Model):
+    """
+    Cold storage for messages older than the hot window (see the
+    ``archive_messages`` command). Rows keep their original ``message_id``.
+    """
+
+    message_id = models.BigIntegerField(primary_key=True)
+    sender = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    receiver = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    conversation = models.ForeignKey(
+        "Conversation",
+        on_delete=models.CASCADE,
+        related_name="archived_messages",
+    )
+    listing = models.ForeignKey(
+        "Listing",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    message_text = models.TextField()
+    is_read = models.BooleanField(default=False)
+    sent_at = models.DateTimeField()
+    read_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-sent_at"]
+        indexes = [
+            models.Index(fields=["conversation", "message_id"], name="archived_conversation_idx"),
+        ]
+
+    def __str__(self):
+        return f"Archived message from {self.sender} to {self.receiver}"
         
 class BlockReview(models.Model):
     block_review_id = models.BigAutoField(primary_key=True)
@@ -390,10 +517,89 @@ class MatchCompatibility(models.Model):
     class Meta:
         unique_together = ("user1", "user2")
         ordering = ["-calculated_at"]
+        indexes = [
+            # Top matches are read from both sides of the pair.
+            models.Index(fields=["user1", "-compatibility_score"], name="match_user1_score_idx"),
+            models.Index(fields=["user2", "-compatibility_score"], name="match_user2_score_idx"),
+        ]
 
     def __str__(self):
         return f"Match {self.user1} ↔ {self.user2} ({self.compatibility_score}%)"
 
+class UserMatch(models.Model):
+    """
+    Directed copy of a MatchCompatibility row, one per side of the pair, so a
+    user's best matches are a single index range scan on (user, -score).
+    Maintained by the match calculation; never edited directly.
+    """
+
+    user_match_id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="directed_matches",
+    )
+    partner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    match = models.ForeignKey(
+        "MatchCompatibility",
+        on_delete=models.CASCADE,
+        related_name="directed",
+    )
+    compatibility_score = models.DecimalField(max_digits=5, decimal_places=2)
+    calculated_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "partner")
+        indexes = [
+            models.Index(
+                fields=["user", "-compatibility_score", "-calculated_at"],
+                name="usermatch_user_top_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} → {self.partner} ({self.compatibility_score}%)"
+
+
+class ListingRecommendation(models.Model):
+    """
+    A user's best-scoring active listings ("listings for you"), at most
+    ``RECOMMENDATIONS_PER_USER`` rows per user, so serving them is one index
+    range scan on (user, -score). Maintained by ``utils.recommendations``.
+    """
+
+    recommendation_id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="listing_recommendations",
+    )
+    listing = models.ForeignKey(
+        "Listing",
+        on_delete=models.CASCADE,
+        related_name="recommendations",
+    )
+    score = models.DecimalField(max_digits=5, decimal_places=2)
+    criteria = models.JSONField(default=dict, blank=True)
+    calculated_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "listing")
+        indexes = [
+            models.Index(
+                fields=["user", "-score", "-calculated_at"],
+                name="listingrec_user_top_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.listing} for {self.user} ({self.score}%)"
+
+
 class Notification(models.Model):
     class NotificationType(models.TextChoices):
         MESSAGE = "message", "New Message"
@@ -414,12 +620,101 @@ class Notification(models.Model):
     )
     content = models.TextField()
     related_id = models.IntegerField(null=True, blank=True)
+    # Bursts of the same type within the collapse window share one row.
+    event_count = models.PositiveIntegerField(default=1)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    emailed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="notification_user_recent_idx"),
+            models.Index(
+                fields=["user", "-created_at"],
+                condition=models.Q(is_read=False),
+                name="notification_unread_idx",
+            ),
+            # Pending digest e-mails.
+            models.Index(
+                fields=["user", "notification_id"],
+                condition=models.Q(is_read=False, emailed_at__isnull=True),
+                name="notification_digest_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user}: {self.notification_type}"
     
+
+class OutboundEmail(models.Model):
+    """
+    Queued e-mail, delivered by the ``send_queued_email`` worker so requests
+    never wait on SMTP.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENT = "sent", "Sent"
+        DEAD = "dead", "Dead"
+
+    email_id = models.BigAutoField(primary_key=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status="pending"),
+                name="outbound_email_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
+
+class UserToken(models.Model):
+    """
+    Single-use token for e-mail verification or password reset. Only the
+    SHA-256 of the token is stored; lookups are one unique-index probe.
+    """
+
+    class Purpose(models.TextChoices):
+        VERIFY_EMAIL = "verify_email", "Verify e-mail"
+        PASSWORD_RESET = "password_reset", "Password reset"
+
+    token_id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="tokens",
+    )
+    purpose = models.CharField(max_length=20, choices=Purpose.choices)
+    token_hash = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    used_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "purpose"], name="usertoken_user_purpose_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_purpose_display()} token for {self.user}"
@@ -0,0 +1,105 @@
+"""
+Database routing between the primary (``default``) and optional read replicas.
+
+Reads go to a random alias in ``REPLICA_DATABASES`` unless the current
+context must see its own writes: once anything has been written, inside a
+transaction on the primary, in unsafe (POST, ...) requests and for
+``READ_YOUR_WRITES_SECONDS`` after a request that wrote (see
+``kustay.middleware.read_your_writes_middleware``). Writes always go to the
+primary.
+"""
+from __future__ import annotations
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+@dataclass
+class RoutingState:
+    primary: bool = False
+    wrote: bool = False
+    read_alias: str | None = None
+
+
+# Mutable per request/task, so writes made in a sync_to_async thread still
+# pin the rest of the request.
+_state: ContextVar[RoutingState | None] = ContextVar("kustay_db_routing", default=None)
+
+
+def _current() -> RoutingState:
+    state = _state.get()
+    if state is None:
+        state = RoutingState()
+        _state.set(state)
+    return state
+
+
+@contextmanager
+def routing_scope(primary: bool = False):
+    """Fresh routing state for one request; yields it so the caller can check ``wrote``."""
+    token = _state.set(RoutingState(primary=primary))
+    try:
+        yield _state.get()
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def pin_to_primary():
+    """Sends every read inside the block to the primary."""
+    state = _current()
+    previous, state.primary = state.primary, True
+    try:
+        yield
+    finally:
+        state.primary = previous
+
+
+@contextmanager
+def read_from(alias: str):
+    """
+    Sends every read inside the block to ``alias`` even after writes, e.g. a
+    batch job that reads a replica and writes the primary.
+    """
+    if alias not in settings.DATABASES:
+        raise ValueError(f"Unknown database alias {alias!r}.")
+    state = _current()
+    previous, state.read_alias = state.read_alias, alias
+    try:
+        yield
+    finally:
+        state.read_alias = previous
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _current()
+        if state.read_alias:
+            return state.read_alias
+        replicas = settings.REPLICA_DATABASES
+        if not replicas or state.primary or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # Related objects come from wherever the instance was loaded.
+            return instance._state.db
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _current().wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        return obj1._state.db in aliases and obj2._state.db in aliases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication.
+        return db not in settings.REPLICA_DATABASES
@@ -3,15 +3,31 @@ from rest_framework import serializers
 from .models import Listing, ListingImage, Profile
 
 
+# Named field presets selectable with ``?view=`` on the listings API.
+LISTING_VIEW_PRESETS = {
+    "card": [
+        "listing_id",
+        "title",
+        "rent_amount",
+        "listing_type",
+        "room_type",
+        "neighborhood",
+        "image",
+        "image_variants",
+    ],
+}
+
+
 class ListingImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = ListingImage
-        fields = ["image_id", "image_url", "is_primary", "upload_date"]
+        fields = ["image_id", "image_url", "image", "is_primary", "upload_date"]
 
 
 class ListingSerializer(serializers.ModelSerializer):
     images = ListingImageSerializer(many=True, read_only=True)
     user = serializers.StringRelatedField(read_only=True)
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Listing
@@ -34,11 +50,74 @@ class ListingSerializer(serializers.ModelSerializer):
             "house_rules",
             "is_active",
             "image",
+            "image_width",
+            "image_height",
+            "image_variants",
             "created_at",
             "updated_at",
             "images",
         ]
-        read_only_fields = ["listing_id", "created_at", "updated_at"]
+        read_only_fields = [
+            "listing_id",
+            "image_width",
+            "image_height",
+            "created_at",
+            "updated_at",
+        ]
+
+    def __init__(self, *args, **kwargs):
+        # Optional whitelist of output fields (sparse fieldsets).
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def get_image_variants(self, obj):
+        request = self.context.get("request")
+        urls = obj.image_variant_urls
+        if request is not None:
+            for entry in urls.values():
+                for key, value in entry.items():
+                    if isinstance(value, str):
+                        entry[key] = request.build_absolute_uri(value)
+        return urls
+
+
+def resolve_listing_fields(query_params):
+    """
+    Resolves ``?view=``, ``?fields=`` and ``?omit=`` into the list of
+    ListingSerializer fields to render, or None when the full representation
+    was requested. Unknown names are ignored; the primary key is always kept.
+    """
+    available = ListingSerializer.Meta.fields
+    view = query_params.get("view", "").strip()
+    requested = query_params.get("fields", "").strip()
+    omitted = query_params.get("omit", "").strip()
+
+    if not (view or requested or omitted):
+        return None
+
+    if requested:
+        selected = _split_csv(requested)
+    elif view in LISTING_VIEW_PRESETS:
+        selected = LISTING_VIEW_PRESETS[view]
+    else:
+        selected = available
+
+    excluded = set(_split_csv(omitted))
+    fields = [
+        name
+        for name in available
+        if name in selected and name not in excluded
+    ]
+    if "listing_id" not in fields:
+        fields.insert(0, "listing_id")
+    return fields
+
+
+def _split_csv(value):
+    return [term.strip() for term in value.split(",") if term.strip()]
 
 
 class ProfileSerializer(serializers.ModelSerializer):
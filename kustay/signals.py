@@ -1,7 +1,7 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
-from .models import Profile
+from .models import BlockedUser, Listing, ListingImage, Profile, Review, User
 
 
 @receiver(post_save, sender=Profile)
@@ -16,3 +16,205 @@ def refresh_matches_on_profile_save(sender, instance: Profile, **kwargs):
     from .utils.matching import calculate_matches_for_user
 
     calculate_matches_for_user(user)
+
+
+@receiver(post_save, sender=Profile)
+def refresh_recommendations_on_profile_save(sender, instance: Profile, raw=False, **kwargs):
+    if raw:
+        return
+
+    from .utils.background import run_in_background
+    from .utils.recommendations import recommend_for_user
+
+    run_in_background(recommend_for_user, instance.user_id)
+
+
+@receiver(post_save, sender=Listing)
+def refresh_recommendations_on_listing_save(
+    sender, instance: Listing, raw=False, update_fields=None, **kwargs
+):
+    """
+    Rescore a changed listing for every profile off the request path; saves
+    that leave the scored fields alone are skipped.
+    """
+    from .utils.recommendations import LISTING_SCORE_FIELDS, update_recommendations_for_listing
+
+    if raw or (update_fields is not None and not LISTING_SCORE_FIELDS & set(update_fields)):
+        return
+
+    from .utils.background import run_in_background
+
+    run_in_background(update_recommendations_for_listing, instance.pk)
+
+
+@receiver(pre_delete, sender=Listing)
+def remember_recommended_users(sender, instance: Listing, **kwargs):
+    """The listing's recommendation rows go with it; note whose lists shrink."""
+    from .models import ListingRecommendation
+
+    instance._recommended_user_ids = list(
+        ListingRecommendation.objects.filter(listing=instance).values_list("user_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Listing)
+def refill_recommendations_on_listing_delete(sender, instance: Listing, **kwargs):
+    user_ids = getattr(instance, "_recommended_user_ids", None)
+    if not user_ids:
+        return
+
+    from .utils.background import run_in_background
+    from .utils.recommendations import refill_recommendations
+
+    run_in_background(refill_recommendations, user_ids)
+
+
+@receiver(post_save, sender=Listing)
+def process_listing_image_on_save(sender, instance: Listing, **kwargs):
+    """
+    Build resized image variants off the request path when the upload changes.
+    """
+    from .utils.background import run_in_background
+    from .utils.images import needs_processing, process_listing_image
+
+    if needs_processing(instance):
+        run_in_background(process_listing_image, instance.pk)
+
+
+@receiver(post_delete, sender=Listing)
+def delete_listing_image_variants(sender, instance: Listing, **kwargs):
+    from .utils.background import run_in_background
+    from .utils.images import delete_listing_variants
+
+    run_in_background(delete_listing_variants, instance.pk)
+
+
+@receiver(post_init, sender=Listing)
+@receiver(post_init, sender=ListingImage)
+def remember_loaded_image(sender, instance, **kwargs):
+    """Record the image name a row was loaded with (unless the field was deferred)."""
+    loaded = instance.__dict__.get("image")
+    if isinstance(loaded, str):
+        instance._loaded_image_name = loaded or None
+
+
+@receiver(pre_save, sender=Listing)
+@receiver(pre_save, sender=ListingImage)
+def remember_previous_image(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Record the stored image name before a save so blob references can be moved.
+    Instances loaded with their image need no query for it.
+    """
+    instance._previous_image_name = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and "image" not in update_fields:
+        return
+    if hasattr(instance, "_loaded_image_name"):
+        instance._previous_image_name = instance._loaded_image_name
+        return
+    instance._previous_image_name = (
+        sender.objects.filter(pk=instance.pk).values_list("image", flat=True).first()
+        or None
+    )
+
+
+@receiver(post_save, sender=Listing)
+@receiver(post_save, sender=ListingImage)
+def update_image_blob_references(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and "image" not in update_fields):
+        return
+
+    from .storage import acquire_blob, release_blob
+
+    previous = getattr(instance, "_previous_image_name", None)
+    current = instance.image.name or None
+    instance._loaded_image_name = current
+    if previous == current:
+        return
+    if current:
+        acquire_blob(current, instance.image)
+    if previous:
+        release_blob(previous)
+
+
+@receiver(post_delete, sender=Listing)
+@receiver(post_delete, sender=ListingImage)
+def release_image_blob(sender, instance, **kwargs):
+    if not instance.image:
+        return
+
+    from .storage import release_blob
+
+    release_blob(instance.image.name)
+
+
+@receiver(post_save, sender=BlockedUser)
+@receiver(post_delete, sender=BlockedUser)
+def invalidate_blocked_pairs(sender, **kwargs):
+    from django.db import transaction
+
+    from .utils.blocking import invalidate_blocked_index
+
+    transaction.on_commit(invalidate_blocked_index)
+
+
+@receiver(post_save, sender=BlockedUser)
+@receiver(post_delete, sender=BlockedUser)
+def refresh_recommendations_on_block(sender, instance: BlockedUser, **kwargs):
+    """Listings of a blocked (or unblocked) owner leave (or may rejoin) both lists."""
+    from .utils.background import run_in_background
+    from .utils.recommendations import recommend_for_user
+
+    for user_id in (instance.blocker_id, instance.blocked_id):
+        run_in_background(recommend_for_user, user_id)
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_moderation_status(sender, instance: Review, raw=False, **kwargs):
+    instance._previous_moderation_status = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_moderation_status = (
+        sender.objects.filter(pk=instance.pk).values_list("moderation_status", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def notify_review_moderation(sender, instance: Review, raw=False, **kwargs):
+    """
+    Tell the people involved once a moderator approves or rejects a review.
+    """
+    status = instance.moderation_status
+    if raw or status == getattr(instance, "_previous_moderation_status", None):
+        return
+
+    from .models import Notification
+    from .utils.notifications import NotificationEvent, notify
+
+    review_type = Notification.NotificationType.REVIEW
+    if status == Review.ModerationStatus.APPROVED:
+        notify([
+            NotificationEvent(instance.reviewed_user_id, review_type, "You received a new review.", instance.pk),
+            NotificationEvent(instance.reviewer_id, review_type, "Your review was approved.", instance.pk),
+        ])
+    elif status == Review.ModerationStatus.REJECTED:
+        notify([
+            NotificationEvent(instance.reviewer_id, review_type, "Your review was not approved.", instance.pk),
+        ])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_user_cache(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    from django.db import transaction
+
+    from .utils.user_cache import invalidate_cached_user
+
+    user_id = instance.pk if sender is User else instance.user_id
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
@@ -0,0 +1,155 @@
+"""
+Content-addressed storage for listing media.
+
+Uploads are hashed while they are streamed to disk and stored under their
+SHA-256 digest, so identical photos are written once no matter how often they
+are uploaded. ``MediaBlob`` keeps a reference count per stored file; a blob is
+only removed from disk when the last listing (or listing image) pointing at it
+lets go.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from pathlib import PurePosixPath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+# ``<prefix>/<ab>/<64 hex chars>.<ext>``
+CONTENT_ADDRESSED_NAME = re.compile(r"(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]+)?$")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files after the digest of their content.
+    Saving content that is already stored is a no-op returning the existing name.
+    """
+
+    hash_algorithm = "sha256"
+
+    def __init__(self, *args, **kwargs):
+        # Same name always means same bytes, so overwriting is harmless.
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(*args, **kwargs)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        digest = self.digest(content)
+        name = self.content_name(name, digest)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def restore(self, name: str, content) -> bool:
+        """Writes ``content`` back under ``name`` if it still hashes to that name."""
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        if self.digest(content) != PurePosixPath(name).stem:
+            return False
+        super().save(name, content)
+        return True
+
+    def digest(self, content) -> str:
+        hasher = hashlib.new(self.hash_algorithm)
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        if hasattr(content, "seek"):
+            content.seek(0)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def content_name(name: str, digest: str) -> str:
+        path = PurePosixPath(name)
+        prefix = str(path.parent) if str(path.parent) != "." else ""
+        suffix = path.suffix.lower()
+        parts = [prefix, digest[:2], f"{digest}{suffix}"]
+        return "/".join(part for part in parts if part)
+
+
+def listing_media_storage():
+    """Storage used by listing image fields (configured via ``STORAGES``)."""
+    return storages["listing_media"]
+
+
+def is_content_addressed(name: str) -> bool:
+    return bool(name and CONTENT_ADDRESSED_NAME.search(name))
+
+
+def acquire_blob(name: str, content=None) -> None:
+    """
+    Adds a reference to a stored blob. ``save`` reuses an existing file before
+    the reference is taken, so the last other reference may have been dropped
+    and the file deleted in between; a new reference therefore checks that the
+    file is still there and writes ``content`` again if not.
+    """
+    from .models import MediaBlob
+
+    if not is_content_addressed(name):
+        return
+    # Waits for a concurrent _delete_unreferenced holding the row lock.
+    if MediaBlob.objects.filter(name=name).update(ref_count=F("ref_count") + 1):
+        return
+    try:
+        with transaction.atomic():
+            MediaBlob.objects.create(name=name, ref_count=1)
+    except IntegrityError:
+        MediaBlob.objects.filter(name=name).update(ref_count=F("ref_count") + 1)
+        return
+
+    storage = listing_media_storage()
+    if storage.exists(name):
+        return
+    try:
+        restored = content is not None and storage.restore(name, content)
+    except OSError:
+        restored = False
+    if not restored:
+        logger.warning("Blob %s was deleted before it could be referenced.", name)
+
+
+def release_blob(name: str) -> None:
+    """
+    Drops a reference to a stored blob and deletes the file once nothing
+    references it anymore. Files written before content addressing are left alone.
+    """
+    from .models import MediaBlob
+
+    if not is_content_addressed(name):
+        return
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+        if blob is None or blob.ref_count == 0:
+            return
+        MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") - 1)
+        if blob.ref_count == 1:
+            transaction.on_commit(lambda: _delete_unreferenced(name))
+
+
+def _delete_unreferenced(name: str) -> None:
+    """
+    Deletes the file and its row while holding the row lock, so ``acquire_blob``
+    either re-references it first or runs after both are gone.
+    """
+    from .models import MediaBlob
+
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+        # A new upload of the same content may have re-acquired the blob meanwhile.
+        if blob is None or blob.ref_count > 0:
+            return
+        storage = listing_media_storage()
+        if storage.exists(name):
+            storage.delete(name)
+        blob.delete()
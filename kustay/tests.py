@@ -1,3 +1,108 @@
-from django.test import TestCase
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from .middleware import PRIMARY_COOKIE
+from .models import BlockedUser, Listing, User
+from .routers import routing_scope
+from .utils.blocking import get_blocked_index
+
+
+@override_settings(REPLICA_DATABASES=["replica1"], RATELIMIT_ENABLED=False)
+class ReplicaRoutingTests(TransactionTestCase):
+    """``replica1`` mirrors ``default`` in tests, so both aliases see the same rows."""
+
+    databases = {"default", "replica1"}
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        # Django only closes the pool of the alias it tears down, not a mirror's.
+        connections["replica1"].close_pool()
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="reader@example.com", username="reader", password="replica-pass-123"
+        )
+
+    def test_reads_go_to_replica(self):
+        with routing_scope():
+            self.assertEqual(Listing.objects.all().db, "replica1")
+
+    def test_reads_after_write_go_to_primary(self):
+        with routing_scope():
+            User.objects.filter(pk=self.user.pk).update(first_name="Reader")
+            self.assertEqual(Listing.objects.all().db, "default")
+
+    def test_primary_scope_reads_from_primary(self):
+        with routing_scope(primary=True):
+            self.assertEqual(Listing.objects.all().db, "default")
+
+    def test_get_request_reads_from_replica(self):
+        with CaptureQueriesContext(connections["default"]) as primary, CaptureQueriesContext(
+            connections["replica1"]
+        ) as replica:
+            response = self.client.get("/api/listings/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(replica.captured_queries)
+        self.assertFalse(primary.captured_queries)
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_unsafe_request_reads_from_primary(self):
+        with CaptureQueriesContext(connections["replica1"]) as replica:
+            response = self.client.post(
+                "/api/auth/login/",
+                {"email": "reader@example.com", "password": "wrong-password"},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(replica.captured_queries)
+
+    def test_cookie_pins_follow_up_reads_to_primary(self):
+        response = self.client.post(
+            "/api/auth/login/",
+            {"email": "reader@example.com", "password": "replica-pass-123"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+
+        with CaptureQueriesContext(connections["replica1"]) as replica:
+            self.assertEqual(self.client.get("/api/listings/").status_code, 200)
+        self.assertFalse(replica.captured_queries)
+
+        del self.client.cookies[PRIMARY_COOKIE]
+        with CaptureQueriesContext(connections["replica1"]) as replica:
+            self.assertEqual(self.client.get("/api/listings/").status_code, 200)
+        self.assertTrue(replica.captured_queries)
+
+
+@override_settings(KUSTAY_BACKGROUND_WORKERS=0)
+class BlockedIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(
+            email="alice@example.com", username="alice", password="pw-alice-123"
+        )
+        cls.bob = User.objects.create_user(
+            email="bob@example.com", username="bob", password="pw-bob-12345"
+        )
+
+    @override_settings(BLOCKED_INDEX_CACHE_ENABLED=True)
+    def test_block_invalidates_cached_index(self):
+        self.assertFalse(get_blocked_index().is_blocked(self.alice.pk, self.bob.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            BlockedUser.objects.create(blocker=self.alice, blocked=self.bob)
+        self.assertTrue(get_blocked_index().is_blocked(self.bob.pk, self.alice.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BlockedUser.objects.filter(blocker=self.alice).delete()
+        self.assertFalse(get_blocked_index().is_blocked(self.alice.pk, self.bob.pk))
+
+    @override_settings(BLOCKED_INDEX_CACHE_ENABLED=False)
+    def test_block_from_another_worker_is_seen_without_shared_cache(self):
+        self.assertFalse(get_blocked_index(self.alice.pk).is_blocked(self.alice.pk, self.bob.pk))
+        # No on-commit invalidation runs here, as in a worker that did not save the block.
+        BlockedUser.objects.create(blocker=self.bob, blocked=self.alice)
+        self.assertTrue(get_blocked_index(self.alice.pk).is_blocked(self.alice.pk, self.bob.pk))
+        self.assertIn(self.bob.pk, get_blocked_index().blocked_ids(self.alice.pk))
@@ -0,0 +1,59 @@
+"""
+Minimal in-process background execution for work that should not run in the
+request/response cycle (image processing, fan-out, etc.).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from ..routers import routing_scope
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def run_in_background(func, *args, **kwargs) -> None:
+    """
+    Schedules ``func(*args, **kwargs)`` once the current transaction commits.
+    With ``KUSTAY_BACKGROUND_WORKERS = 0`` the call runs inline on commit, which
+    keeps tests and management commands deterministic.
+    """
+    workers = getattr(settings, "KUSTAY_BACKGROUND_WORKERS", 0)
+    if workers <= 0:
+        transaction.on_commit(lambda: func(*args, **kwargs))
+        return
+
+    def submit():
+        _get_executor(workers).submit(_run, func, args, kwargs)
+
+    transaction.on_commit(submit)
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="kustay-bg",
+            )
+        return _executor
+
+
+def _run(func, args, kwargs) -> None:
+    close_old_connections()
+    try:
+        # Tasks follow a commit and must see it, so they read the primary.
+        with routing_scope(primary=True):
+            func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed.", getattr(func, "__name__", func))
+    finally:
+        close_old_connections()
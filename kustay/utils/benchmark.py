@@ -0,0 +1,202 @@
+"""
+Synthetic dataset used for query-plan checks and load tests.
+
+Seeded users share the ``@bench.kustay.test`` email domain and the password
+``BENCHMARK_PASSWORD``, so they can be told apart from (and removed without
+touching) real accounts.
+"""
+from __future__ import annotations
+
+import random
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import (
+    Conversation,
+    Listing,
+    MatchCompatibility,
+    Message,
+    Notification,
+    Profile,
+)
+from .matching import save_directed_matches
+
+BENCHMARK_EMAIL_DOMAIN = "bench.kustay.test"
+BENCHMARK_PASSWORD = "bench-password-123"
+
+NEIGHBORHOODS = ["Sariyer", "Rumelifeneri", "Besiktas", "Kadikoy", "Sisli", "Uskudar", "Maslak"]
+AMENITIES = ["wifi", "parking", "laundry", "furnished", "balcony", "dishwasher"]
+
+DEFAULT_SIZES = {
+    "users": 2000,
+    "listings_per_user": 5,
+    "conversations_per_user": 5,
+    "messages_per_conversation": 10,
+    "matches_per_user": 50,
+    "notifications_per_user": 20,
+}
+
+
+def benchmark_users():
+    return get_user_model().objects.filter(email__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}")
+
+
+def benchmark_email(index: int) -> str:
+    return f"bench{index}@{BENCHMARK_EMAIL_DOMAIN}"
+
+
+def seed_benchmark_data(seed: int = 491, reset: bool = False, **sizes) -> Dict[str, int]:
+    """
+    Creates the benchmark dataset unless it already exists (or ``reset`` is
+    set). Bulk inserts bypass signals, so no matches are recalculated while
+    seeding. Returns the number of rows created per table.
+    """
+    sizes = {**DEFAULT_SIZES, **{key: value for key, value in sizes.items() if value is not None}}
+    if reset:
+        benchmark_users().delete()
+    elif benchmark_users().exists():
+        return {}
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    UserModel = get_user_model()
+    password = make_password(BENCHMARK_PASSWORD)
+
+    with transaction.atomic():
+        users = UserModel.objects.bulk_create(
+            [
+                UserModel(
+                    email=benchmark_email(index),
+                    username=f"bench{index}",
+                    password=password,
+                    user_type="KU_Student",
+                    is_verified=True,
+                )
+                for index in range(sizes["users"])
+            ],
+            batch_size=1000,
+        )
+
+        profiles = []
+        for user in users:
+            budget_min = Decimal(rng.randrange(5000, 20000, 500))
+            profiles.append(
+                Profile(
+                    user=user,
+                    first_name=f"Bench{user.pk}",
+                    last_name="User",
+                    sleep_schedule=rng.choice(["early_bird", "night_owl", "flexible"]),
+                    cleanliness_level=rng.choice(["low", "medium", "high"]),
+                    room_type_preference=rng.choice(["private", "shared", "entire_place"]),
+                    budget_min=budget_min,
+                    budget_max=budget_min + rng.randrange(2000, 15000, 500),
+                    preferred_neighborhoods=rng.sample(NEIGHBORHOODS, rng.randint(1, 3)),
+                    smoker=rng.random() < 0.15,
+                    pets=rng.random() < 0.2,
+                )
+            )
+        Profile.objects.bulk_create(profiles, batch_size=1000)
+
+        listings = []
+        for user in users:
+            for index in range(sizes["listings_per_user"]):
+                total_rooms = rng.randint(1, 5)
+                listings.append(
+                    Listing(
+                        user=user,
+                        title=f"{rng.choice(NEIGHBORHOODS)} flat #{user.pk}-{index}",
+                        description="Bright flat close to campus. " * 10,
+                        listing_type=rng.choice(Listing.ListingType.values),
+                        address=f"{rng.randint(1, 200)} Campus Road",
+                        neighborhood=rng.choice(NEIGHBORHOODS),
+                        rent_amount=Decimal(rng.randrange(5000, 40000, 250)),
+                        available_from=(now + timedelta(days=rng.randint(0, 180))).date(),
+                        room_type=rng.choice(Listing.RoomType.values),
+                        total_rooms=total_rooms,
+                        available_rooms=rng.randint(1, total_rooms),
+                        amenities=rng.sample(AMENITIES, rng.randint(0, 4)),
+                        is_active=rng.random() < 0.9,
+                    )
+                )
+        Listing.objects.bulk_create(listings, batch_size=1000)
+
+        pairs = set()
+        for position, user in enumerate(users):
+            for step in range(1, sizes["conversations_per_user"] + 1):
+                partner = users[(position + step * 7) % len(users)]
+                if partner.pk != user.pk:
+                    pairs.add(tuple(sorted((user.pk, partner.pk))))
+        conversations = Conversation.objects.bulk_create(
+            [
+                Conversation(user1_id=low, user2_id=high, last_message_at=now)
+                for low, high in sorted(pairs)
+            ],
+            batch_size=1000,
+        )
+
+        messages = []
+        for conversation in conversations:
+            for index in range(sizes["messages_per_conversation"]):
+                forward = index % 2 == 0
+                messages.append(
+                    Message(
+                        conversation=conversation,
+                        sender_id=conversation.user1_id if forward else conversation.user2_id,
+                        receiver_id=conversation.user2_id if forward else conversation.user1_id,
+                        message_text=f"Benchmark message {index} about the flat.",
+                        is_read=index < sizes["messages_per_conversation"] - 2,
+                    )
+                )
+        Message.objects.bulk_create(messages, batch_size=2000)
+
+        match_pairs = set()
+        for position, user in enumerate(users):
+            for _ in range(sizes["matches_per_user"]):
+                partner = users[rng.randrange(len(users))]
+                if partner.pk != user.pk:
+                    match_pairs.add(tuple(sorted((user.pk, partner.pk))))
+        matches = MatchCompatibility.objects.bulk_create(
+            [
+                MatchCompatibility(
+                    user1_id=low,
+                    user2_id=high,
+                    compatibility_score=Decimal(rng.randint(10, 100)),
+                    matching_criteria={},
+                )
+                for low, high in sorted(match_pairs)
+            ],
+            batch_size=2000,
+        )
+        save_directed_matches(matches)
+
+        notifications = []
+        for user in users:
+            for index in range(sizes["notifications_per_user"]):
+                notifications.append(
+                    Notification(
+                        user=user,
+                        notification_type=rng.choice(Notification.NotificationType.values),
+                        content=f"Benchmark notification {index}",
+                        is_read=index > 2,
+                    )
+                )
+        Notification.objects.bulk_create(notifications, batch_size=2000)
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    return {
+        "users": len(users),
+        "listings": len(listings),
+        "conversations": len(conversations),
+        "messages": len(messages),
+        "matches": len(matches),
+        "notifications": len(notifications),
+    }
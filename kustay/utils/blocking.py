@@ -0,0 +1,99 @@
+"""
+In-memory index of blocked user pairs.
+
+Blocks are symmetric for matching and messaging: if either user blocked the
+other, the pair is blocked. The index is loaded once per batch job. With a
+shared cache (``BLOCKED_INDEX_CACHE_ENABLED``) it is also kept per process and
+revalidated against a version number in the cache that is bumped whenever a
+``BlockedUser`` row is created or deleted. Without one, a bump made by another
+worker would never be seen, so every lookup reads the database instead.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from ..models import BlockedUser
+
+VERSION_CACHE_KEY = "kustay:blocked-pairs:version"
+INDEX_CACHE_KEY = "kustay:blocked-pairs:{version}"
+INDEX_CACHE_TIMEOUT = 60 * 60
+
+_EMPTY: FrozenSet[int] = frozenset()
+
+_local = threading.local()
+
+
+class BlockedPairIndex:
+    """Adjacency sets of blocked pairs with O(1) ``is_blocked`` checks."""
+
+    def __init__(self, pairs: Iterable[Tuple[int, int]] = ()):
+        self._neighbors: Dict[int, Set[int]] = {}
+        for blocker_id, blocked_id in pairs:
+            self._neighbors.setdefault(blocker_id, set()).add(blocked_id)
+            self._neighbors.setdefault(blocked_id, set()).add(blocker_id)
+
+    @classmethod
+    def load(cls) -> "BlockedPairIndex":
+        pairs = BlockedUser.objects.values_list("blocker_id", "blocked_id")
+        return cls(pairs.iterator(chunk_size=5000))
+
+    @classmethod
+    def for_user(cls, user_id: int) -> "BlockedPairIndex":
+        """Only the pairs involving ``user_id`` (one query)."""
+        pairs = BlockedUser.objects.filter(Q(blocker_id=user_id) | Q(blocked_id=user_id))
+        return cls(pairs.values_list("blocker_id", "blocked_id"))
+
+    def is_blocked(self, user_a_id: int, user_b_id: int) -> bool:
+        return user_b_id in self._neighbors.get(user_a_id, _EMPTY)
+
+    def blocked_ids(self, user_id: int) -> FrozenSet[int]:
+        """Users that ``user_id`` blocked or was blocked by."""
+        return frozenset(self._neighbors.get(user_id, _EMPTY))
+
+    def __len__(self) -> int:
+        return sum(len(neighbors) for neighbors in self._neighbors.values()) // 2
+
+
+def get_blocked_index(user_id: int | None = None) -> BlockedPairIndex:
+    """
+    Returns the current index. With a shared cache a per-thread copy is reused
+    as long as the cached version has not moved, so steady-state lookups cost
+    one cache read. Otherwise it is read from the database: only the pairs of
+    ``user_id`` when given, else all of them.
+    """
+    if not settings.BLOCKED_INDEX_CACHE_ENABLED:
+        return BlockedPairIndex.load() if user_id is None else BlockedPairIndex.for_user(user_id)
+
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        # Start from a fresh number so an evicted version never resurrects an
+        # index cached under an older one.
+        cache.add(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_CACHE_KEY)
+
+    if getattr(_local, "version", None) == version:
+        return _local.index
+
+    key = INDEX_CACHE_KEY.format(version=version)
+    index = cache.get(key)
+    if index is None:
+        index = BlockedPairIndex.load()
+        cache.set(key, index, timeout=INDEX_CACHE_TIMEOUT)
+
+    _local.version = version
+    _local.index = index
+    return index
+
+
+def invalidate_blocked_index() -> None:
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+    _local.__dict__.clear()
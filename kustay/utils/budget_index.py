@@ -0,0 +1,83 @@
+"""
+Static interval index over normalized profile budget ranges.
+
+Intervals are sorted by their lower bound and every node of the implicit
+balanced tree over that array stores the largest upper bound in its subtree.
+An overlap query prunes any subtree that starts after the query range or ends
+before it, so it runs in ``O(log n + k)`` for ``k`` overlapping budgets, and
+reports the overlap length along with each match so scorers can reuse it.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Generic, Iterable, Iterator, List, Tuple, TypeVar
+
+from ..models import Profile
+
+T = TypeVar("T")
+
+_ZERO = Decimal("0")
+
+
+class BudgetIntervalIndex(Generic[T]):
+    """Overlap queries over closed ``[low, high]`` intervals carrying a payload."""
+
+    def __init__(self, intervals: Iterable[Tuple[Decimal, Decimal, T]] = ()):
+        entries = sorted(intervals, key=lambda entry: entry[0])
+        self._lows: List[Decimal] = [entry[0] for entry in entries]
+        self._highs: List[Decimal] = [entry[1] for entry in entries]
+        self._payloads: List[T] = [entry[2] for entry in entries]
+        self._max_high: List[Decimal] = list(self._highs)
+        if entries:
+            self._build(0, len(entries))
+
+    @classmethod
+    def for_profiles(cls, profiles: Iterable[Profile]) -> "BudgetIntervalIndex[Profile]":
+        """Indexes ``profiles`` by their normalized budget range."""
+        from .matching import _normalize_budget_range
+
+        return cls((*_normalize_budget_range(profile), profile) for profile in profiles)
+
+    def _build(self, start: int, stop: int) -> Decimal:
+        mid = (start + stop) // 2
+        highest = self._highs[mid]
+        if start < mid:
+            highest = max(highest, self._build(start, mid))
+        if mid + 1 < stop:
+            highest = max(highest, self._build(mid + 1, stop))
+        self._max_high[mid] = highest
+        return highest
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def query(self, low: Decimal, high: Decimal) -> Iterator[Tuple[T, Decimal]]:
+        """
+        Yields ``(payload, overlap)`` for every interval sharing at least one
+        point with ``[low, high]``. Touching intervals report an overlap of 0.
+        """
+        cut = bisect_right(self._lows, high)
+        if not cut:
+            return
+        stack = [(0, len(self._payloads))]
+        while stack:
+            start, stop = stack.pop()
+            if start >= stop or start >= cut:
+                continue
+            mid = (start + stop) // 2
+            if self._max_high[mid] < low:
+                continue
+            if mid < cut and self._highs[mid] >= low:
+                yield self._payloads[mid], self._overlap(mid, low, high)
+            stack.append((start, mid))
+            stack.append((mid + 1, stop))
+
+    def scan(self, low: Decimal, high: Decimal) -> Iterator[Tuple[T, Decimal]]:
+        """Yields every payload with its overlap against ``[low, high]``, even if 0."""
+        for position, payload in enumerate(self._payloads):
+            yield payload, self._overlap(position, low, high)
+
+    def _overlap(self, position: int, low: Decimal, high: Decimal) -> Decimal:
+        overlap = min(self._highs[position], high) - max(self._lows[position], low)
+        return overlap if overlap > 0 else _ZERO
@@ -0,0 +1,31 @@
+"""
+Connection pool metrics.
+
+With ``DB_POOL`` enabled every thread of the process borrows its connection
+from one psycopg pool. ``pool_stats`` reports its size and the counters
+psycopg keeps: how many requests had to wait, for how long in total, and how
+many failed (``requests_errors``) because ``max_size`` connections stayed in
+use past ``DB_POOL_TIMEOUT``.
+"""
+from __future__ import annotations
+
+from typing import Dict
+
+from django.db import connections
+
+
+def pool_stats(alias: str = "default") -> Dict[str, object]:
+    """
+    Current metrics of ``alias``'s pool; ``{"enabled": False}`` without one.
+    Counters are cumulative since the pool opened.
+    """
+    pool = connections[alias].pool
+    if pool is None:
+        return {"enabled": False}
+
+    stats: Dict[str, object] = {"enabled": True, "name": pool.name, **pool.get_stats()}
+    stats["in_use"] = stats["pool_size"] - stats["pool_available"]
+    # Only requests that found no free connection are queued and timed.
+    queued = stats.get("requests_queued", 0)
+    stats["avg_wait_ms"] = round(stats.get("requests_wait_ms", 0) / queued, 2) if queued else 0.0
+    return stats
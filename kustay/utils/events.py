@@ -0,0 +1,185 @@
+"""
+Per-user event delivery for the server-sent events stream.
+
+Each ASGI worker keeps an ``EventBroker`` holding one subscription (an
+``asyncio.Queue``) per open stream, so every tab a user has open receives
+the event; idle streams cost a queue, not a thread. Application code calls ``publish_event`` from any thread and the
+configured backend routes the event to the broker of whichever worker holds
+the user's stream:
+
+* ``LocalEventBackend`` delivers inside the current process only.
+* ``PostgresEventBackend`` sends ``pg_notify`` so every worker sharing the
+  database receives the event through one ``LISTEN`` thread per process.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from typing import Any, Dict, Set, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class Subscription:
+    """Events queued for one stream. ``None`` tells the stream to close."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue[Tuple[str, Any] | None] = asyncio.Queue(
+            maxsize=SUBSCRIPTION_QUEUE_SIZE
+        )
+
+    def put(self, item: Tuple[str, Any] | None) -> None:
+        """Thread-safe enqueue; a slow client loses its oldest events first."""
+        try:
+            self.loop.call_soon_threadsafe(self._put_nowait, item)
+        except RuntimeError:  # The stream's event loop is already closed.
+            pass
+
+    def _put_nowait(self, item) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(item)
+
+    def close(self) -> None:
+        self.put(None)
+
+
+class EventBroker:
+    """In-process fan-out from user ids to each of their open streams."""
+
+    def __init__(self):
+        self._subscriptions: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Subscription:
+        """Opens a stream for the user alongside any they already have."""
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id: int, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[user_id]
+
+    def dispatch(self, user_id: int, event: str, data: Any) -> None:
+        with self._lock:
+            subscriptions = tuple(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put((event, data))
+
+    def __len__(self) -> int:
+        """Number of users with at least one open stream."""
+        return len(self._subscriptions)
+
+
+class LocalEventBackend:
+    """Delivers events to streams held by this process once the transaction commits."""
+
+    def __init__(self):
+        self.broker = EventBroker()
+
+    def publish(self, user_id: int, event: str, data: Any) -> None:
+        transaction.on_commit(lambda: self.broker.dispatch(user_id, event, data))
+
+    def start(self) -> None:
+        """Called before the first stream opens in this process."""
+
+
+class PostgresEventBackend(LocalEventBackend):
+    """
+    Cross-process delivery with ``NOTIFY``/``LISTEN``. Notifications sent
+    inside a transaction are only delivered if it commits.
+    """
+
+    channel = "kustay_events"
+    poll_timeout = 5.0
+
+    def __init__(self):
+        super().__init__()
+        self._listener: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def publish(self, user_id: int, event: str, data: Any) -> None:
+        payload = json.dumps({"user_id": user_id, "event": event, "data": data}, cls=DjangoJSONEncoder)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(
+                    target=self._listen, name="kustay-events-listen", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self) -> None:
+        # A dedicated connection outside Django's per-thread handling and the
+        # pool: it lives as long as the worker and only waits for notifications.
+        wrapper = connections.create_connection("default")
+        params = wrapper.get_connection_params()
+        raw = wrapper.Database.connect(**params)
+        raw.autocommit = True
+        with raw.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+
+        try:
+            while True:
+                for payload in self._wait(raw):
+                    self._deliver(payload)
+        except Exception:
+            logger.exception("Event listener stopped.")
+        finally:
+            raw.close()
+
+    def _wait(self, raw):
+        if hasattr(raw, "poll"):  # psycopg2
+            if select.select([raw], [], [], self.poll_timeout)[0]:
+                raw.poll()
+                while raw.notifies:
+                    yield raw.notifies.pop(0).payload
+        else:  # psycopg 3
+            for notify in raw.notifies(timeout=self.poll_timeout):
+                yield notify.payload
+
+    def _deliver(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self.broker.dispatch(message["user_id"], message["event"], message["data"])
+        except (ValueError, KeyError):
+            logger.warning("Ignoring malformed event payload %r.", payload)
+
+
+def get_event_backend() -> LocalEventBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(settings.KUSTAY_EVENT_BACKEND)()
+        return _backend
+
+
+def publish_event(user_id: int, event: str, data: Any) -> None:
+    """Sends ``event`` to ``user_id``'s open stream, wherever it is served."""
+    get_event_backend().publish(user_id, event, data)
+
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
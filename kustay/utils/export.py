@@ -0,0 +1,128 @@
+"""
+Constant-memory exports of large tables as NDJSON or CSV.
+
+Rows are read in primary-key order with keyset pagination, so an export can be
+resumed from the last primary key it emitted (``after=<pk>``) and memory use
+does not grow with the table size.
+"""
+from __future__ import annotations
+
+import csv
+import json
+from typing import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ..models import Listing, MatchCompatibility
+
+EXPORT_DATASETS = {
+    "listings": {
+        "model": Listing,
+        "fields": [
+            "listing_id",
+            "user_id",
+            "title",
+            "description",
+            "listing_type",
+            "address",
+            "neighborhood",
+            "latitude",
+            "longitude",
+            "rent_amount",
+            "available_from",
+            "room_type",
+            "total_rooms",
+            "available_rooms",
+            "amenities",
+            "house_rules",
+            "is_active",
+            "image",
+            "created_at",
+            "updated_at",
+        ],
+    },
+    "matches": {
+        "model": MatchCompatibility,
+        "fields": [
+            "match_id",
+            "user1_id",
+            "user2_id",
+            "compatibility_score",
+            "matching_criteria",
+            "calculated_at",
+        ],
+    },
+}
+
+EXPORT_FORMATS = ("ndjson", "csv")
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def iter_export_rows(
+    dataset: str,
+    after: int | None = None,
+    limit: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[dict]:
+    """
+    Yields rows of ``dataset`` as dicts in primary-key order, starting after
+    the ``after`` cursor. Each page is a separate indexed range query.
+    """
+    spec = EXPORT_DATASETS[dataset]
+    model = spec["model"]
+    pk_name = model._meta.pk.attname
+    fields = spec["fields"]
+
+    cursor = after
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page_size = chunk_size if remaining is None else min(chunk_size, remaining)
+        page = model._default_manager.order_by(pk_name)
+        if cursor is not None:
+            page = page.filter(pk__gt=cursor)
+        page = page.values(*fields)[:page_size]
+
+        emitted = 0
+        for row in page.iterator(chunk_size=chunk_size):
+            emitted += 1
+            cursor = row[pk_name]
+            yield row
+
+        if remaining is not None:
+            remaining -= emitted
+        if emitted < page_size:
+            break
+
+
+def render_ndjson(rows: Iterable[dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def render_csv(dataset: str, rows: Iterable[dict]) -> Iterator[str]:
+    fields = EXPORT_DATASETS[dataset]["fields"]
+    buffer = _LineBuffer()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(
+            {
+                key: json.dumps(value, cls=DjangoJSONEncoder)
+                if isinstance(value, (dict, list))
+                else value
+                for key, value in row.items()
+            }
+        )
+
+
+def render_export(dataset: str, export_format: str, rows: Iterable[dict]) -> Iterator[str]:
+    if export_format == "csv":
+        return render_csv(dataset, rows)
+    return render_ndjson(rows)
+
+
+class _LineBuffer:
+    """File-like object whose ``write`` returns the text instead of storing it."""
+
+    def write(self, value):
+        return value
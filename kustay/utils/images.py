@@ -0,0 +1,176 @@
+"""
+Responsive image variants for listing photos.
+
+Uploads are kept as-is; every listing image additionally gets resized WebP and
+JPEG renditions with metadata stripped. The variant map is stored on
+``Listing.image_variants`` together with the source name it was built from, so
+stale variants are detected without extra queries.
+"""
+from __future__ import annotations
+
+from io import BytesIO
+from pathlib import PurePosixPath
+from typing import Dict
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from ..models import Listing
+
+# Longest edge in pixels for each rendition.
+IMAGE_VARIANTS = {
+    "thumb": 160,
+    "card": 480,
+    "full": 1600,
+}
+
+VARIANT_FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+VARIANT_ROOT = "listing_images/variants"
+
+
+def needs_processing(listing: Listing) -> bool:
+    """True when the stored variants were not built from the current image."""
+    source = (listing.image_variants or {}).get("source")
+    current = listing.image.name if listing.image else None
+    return source != current
+
+
+def process_listing_image(listing_id: int) -> bool:
+    """
+    Builds all variants for a listing's current image and records them.
+    Returns False when there was nothing to do (listing gone, image replaced
+    meanwhile, or variants already current).
+    """
+    listing = (
+        Listing.objects.filter(pk=listing_id)
+        .only("listing_id", "image", "image_variants")
+        .first()
+    )
+    if listing is None or not needs_processing(listing):
+        return False
+
+    previous = listing.image_variants or {}
+    if not listing.image:
+        Listing.objects.filter(
+            Q(image="") | Q(image__isnull=True),
+            pk=listing_id,
+        ).update(
+            image_variants={},
+            image_width=None,
+            image_height=None,
+            updated_at=timezone.now(),
+        )
+        delete_variant_files(previous)
+        return True
+
+    source_name = listing.image.name
+    with listing.image.open("rb") as handle:
+        original = Image.open(handle)
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    variants: Dict[str, object] = {"source": source_name}
+    stem = PurePosixPath(source_name).stem
+    for variant, edge in IMAGE_VARIANTS.items():
+        variants[variant] = _render_variant(original, listing_id, stem, variant, edge)
+
+    # updated_at moves so cached listing cards pick up the new variants.
+    updated = Listing.objects.filter(pk=listing_id, image=source_name).update(
+        image_variants=variants,
+        image_width=original.width,
+        image_height=original.height,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        # The image changed while we were working; the newer upload wins.
+        delete_variant_files(variants)
+        return False
+
+    delete_variant_files(previous, keep=variants)
+    return True
+
+
+def delete_variant_files(variants: dict, keep: dict | None = None) -> None:
+    kept = set(_variant_names(keep or {}))
+    for name in _variant_names(variants or {}):
+        if name not in kept and default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def delete_listing_variants(listing_id: int) -> None:
+    """Removes every stored rendition of a (deleted) listing."""
+    directory = f"{VARIANT_ROOT}/{listing_id}"
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for filename in files:
+        default_storage.delete(f"{directory}/{filename}")
+
+
+def variant_urls(variants: dict) -> Dict[str, Dict[str, object]]:
+    """Maps stored variant names to URLs for templates and serializers."""
+    urls: Dict[str, Dict[str, object]] = {}
+    for variant in IMAGE_VARIANTS:
+        entry = (variants or {}).get(variant)
+        if not entry:
+            continue
+        urls[variant] = {
+            "width": entry.get("width"),
+            "height": entry.get("height"),
+            **{
+                fmt: default_storage.url(entry[fmt])
+                for fmt in VARIANT_FORMATS
+                if entry.get(fmt)
+            },
+        }
+    return urls
+
+
+def _variant_names(variants: dict):
+    for variant in IMAGE_VARIANTS:
+        entry = variants.get(variant) or {}
+        for fmt in VARIANT_FORMATS:
+            if entry.get(fmt):
+                yield entry[fmt]
+
+
+def _render_variant(original: Image.Image, listing_id: int, stem: str, variant: str, edge: int):
+    resized = original.copy()
+    resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+
+    entry: Dict[str, object] = {"width": resized.width, "height": resized.height}
+    for fmt, options in VARIANT_FORMATS.items():
+        image = _flatten(resized) if fmt == "jpeg" else _normalize_mode(resized)
+        buffer = BytesIO()
+        # Re-encoding without passing exif/icc data strips the upload's metadata.
+        image.save(buffer, **options)
+        name = f"{VARIANT_ROOT}/{listing_id}/{stem}-{variant}.{fmt}"
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        entry[fmt] = default_storage.save(name, ContentFile(buffer.getvalue()))
+    return entry
+
+
+def _normalize_mode(image: Image.Image) -> Image.Image:
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    if "transparency" in image.info or image.mode in ("LA", "PA"):
+        return image.convert("RGBA")
+    return image.convert("RGB")
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    image = _normalize_mode(image)
+    if image.mode != "RGBA":
+        return image
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
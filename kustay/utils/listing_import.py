@@ -0,0 +1,202 @@
+"""
+Bulk listing import from CSV or NDJSON.
+
+Every row goes through ``ListingForm`` so imports enforce exactly the same
+rules as the listing create page. Valid rows are loaded in batches with
+Postgres ``COPY`` (``bulk_create`` on other backends); invalid rows are skipped
+and reported with their row number.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+
+from ..forms import ListingForm
+from ..models import Listing
+from .background import run_in_background
+from .recommendations import add_new_listings
+
+IMPORT_FORMATS = ("csv", "ndjson")
+DEFAULT_BATCH_SIZE = 1000
+
+# Columns that cannot be supplied through an import file.
+IGNORED_COLUMNS = {"image"}
+
+
+def detect_format(filename: str | None, default: str = "csv") -> str:
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return default
+
+
+def parse_rows(stream, import_format: str) -> Iterator[Tuple[int, Dict | None, str | None]]:
+    """
+    Yields ``(row_number, data, parse_error)`` for each record of a text stream.
+    Row numbers are 1-based and count data rows only.
+    """
+    if import_format == "csv":
+        reader = csv.DictReader(stream)
+        for number, row in enumerate(reader, start=1):
+            yield number, {key.strip(): value for key, value in row.items() if key}, None
+        return
+
+    number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(data, dict):
+            yield number, None, "Each line must be a JSON object."
+            continue
+        yield number, data, None
+
+
+class RowValidator:
+    """Validates rows with a fresh ``ListingForm`` each, so no state carries over."""
+
+    def __init__(self):
+        self.defaults = {
+            name: Listing._meta.get_field(name).get_default()
+            for name in ListingForm.base_fields
+            if name not in IGNORED_COLUMNS and Listing._meta.get_field(name).has_default()
+        }
+
+    def validate(self, data: Dict) -> Tuple[Listing | None, Dict[str, List[str]]]:
+        """Returns an unsaved listing, or the form errors for the row."""
+        data = {key: value for key, value in data.items() if key not in IGNORED_COLUMNS}
+        # Omitted columns keep the model default (a missing checkbox would
+        # otherwise read as "off").
+        for name, default in self.defaults.items():
+            if data.get(name) in (None, ""):
+                data[name] = json.dumps(default) if isinstance(default, (list, dict)) else default
+
+        form = ListingForm(data=data)
+        if not form.is_valid():
+            return None, {field: [str(error) for error in errors] for field, errors in form.errors.items()}
+        return form.instance, {}
+
+
+def import_listings(
+    rows: Iterable[Tuple[int, Dict | None, str | None]],
+    owner,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+) -> Dict[str, object]:
+    """
+    Validates and inserts listings for ``owner``. Returns a report with the
+    number of created and rejected rows and the errors of each rejected row.
+    """
+    validator = RowValidator()
+    created = 0
+    created_ids: List[int] = []
+    errors: List[Dict[str, object]] = []
+    pending: List[Listing] = []
+
+    def flush():
+        nonlocal created
+        if not pending:
+            return
+        if not dry_run:
+            with transaction.atomic():
+                created_ids.extend(load_listings(pending, batch_size=batch_size))
+        created += len(pending)
+        pending.clear()
+
+    for number, data, parse_error in rows:
+        if parse_error:
+            errors.append({"row": number, "errors": {"__all__": [parse_error]}})
+            continue
+
+        listing, row_errors = validator.validate(data)
+        if row_errors:
+            errors.append({"row": number, "errors": row_errors})
+            continue
+
+        listing.user = owner
+        pending.append(listing)
+        if len(pending) >= batch_size:
+            flush()
+    flush()
+
+    if created and not dry_run:
+        # COPY bypasses signals; merge the new listings into the recommendation
+        # lists with one background pass over the profiles.
+        run_in_background(add_new_listings, created_ids)
+
+    return {
+        "created": created,
+        "rejected": len(errors),
+        "dry_run": dry_run,
+        "errors": errors,
+    }
+
+
+def load_listings(listings: List[Listing], batch_size: int = DEFAULT_BATCH_SIZE) -> List[int]:
+    """
+    Inserts already validated listings as fast as the database allows and
+    returns their primary keys (also set on ``listings``).
+    """
+    if connection.vendor == "postgresql":
+        _copy_listings(listings)
+    else:
+        Listing.objects.bulk_create(listings, batch_size=batch_size)
+    return [listing.pk for listing in listings]
+
+
+def _copy_listings(listings: List[Listing]) -> None:
+    # COPY cannot return the generated keys, so take them from the sequence
+    # first and load them explicitly.
+    pk_column = Listing._meta.pk.column
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+            [Listing._meta.db_table, pk_column, len(listings)],
+        )
+        for listing, (pk,) in zip(listings, cursor.fetchall()):
+            listing.pk = pk
+
+    fields = list(Listing._meta.concrete_fields)
+    buffer = io.StringIO()
+    for listing in listings:
+        buffer.write(",".join(_copy_value(field, listing) for field in fields))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    sql = (
+        f"COPY {connection.ops.quote_name(Listing._meta.db_table)} ({columns}) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        if hasattr(raw_cursor, "copy_expert"):  # psycopg2
+            raw_cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with raw_cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def _copy_value(field, listing: Listing) -> str:
+    """One CSV cell; unquoted empty means NULL, quoted empty means ''."""
+    value = field.pre_save(listing, add=True)
+    if value is None:
+        return ""
+    if isinstance(field, models.JSONField):
+        value = json.dumps(value, cls=DjangoJSONEncoder)
+    else:
+        value = field.get_db_prep_save(value, connection)
+        if value is None:
+            return ""
+    return '"' + str(value).replace('"', '""') + '"'
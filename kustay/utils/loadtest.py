@@ -0,0 +1,336 @@
+"""
+HTTP load test against a running server.
+
+Each virtual user logs in through ``/api/auth/login/`` with a benchmark
+account, then sends requests back to back on one keep-alive connection,
+picking endpoints from ``ENDPOINTS`` by weight. Latencies are collected per
+endpoint and summarised as RPS, error rate and p50/p95/p99, so two builds
+can be compared by running the same mix against each.
+
+Only the standard library is used on the client side; the Django ORM is
+used once, before the run, to pick listing and conversation ids.
+"""
+from __future__ import annotations
+
+import http.client
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from typing import Callable, Dict, List, Sequence, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.db.models import Q
+from django.shortcuts import resolve_url
+
+from ..models import Conversation, Listing
+from .benchmark import AMENITIES, BENCHMARK_PASSWORD, NEIGHBORHOODS, benchmark_users
+
+LOGIN_PATH = "/api/auth/login/"
+SEARCH_TERMS = ["flat", "balcony", "rent", "campus", "message"]
+
+
+@dataclass
+class VirtualUser:
+    email: str
+    conversation_ids: List[int]
+    cookies: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class LoadTestData:
+    listing_ids: Sequence[int]
+
+
+PathBuilder = Callable[[LoadTestData, VirtualUser, random.Random], "str | None"]
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """A request in the mix; ``path`` returns ``None`` when it cannot apply to the user."""
+
+    name: str
+    weight: int
+    path: PathBuilder
+    method: str = "GET"
+    form: Callable[[random.Random], Dict[str, str]] | None = None
+
+
+def _fixed(path: str) -> PathBuilder:
+    return lambda data, user, rng: path
+
+
+def _listing_filters(rng: random.Random) -> Dict[str, object]:
+    low = rng.randrange(5000, 25000, 500)
+    params = {
+        "location": rng.choice(NEIGHBORHOODS),
+        "price_min": low,
+        "price_max": low + rng.randrange(2000, 15000, 500),
+    }
+    if rng.random() < 0.5:
+        params["amenities"] = rng.choice(AMENITIES)
+    return params
+
+
+def _listing_search(data, user, rng) -> str:
+    return f"/listings/?{urlencode(_listing_filters(rng))}"
+
+
+def _api_listing_search(data, user, rng) -> str:
+    return f"/api/listings/?{urlencode({'view': 'card', **_listing_filters(rng)})}"
+
+
+def _listing_detail(data, user, rng) -> str | None:
+    return f"/listings/{rng.choice(data.listing_ids)}/" if data.listing_ids else None
+
+
+def _api_listing_detail(data, user, rng) -> str | None:
+    return f"/api/listings/{rng.choice(data.listing_ids)}/" if data.listing_ids else None
+
+
+def _conversation(data, user, rng) -> str | None:
+    if not user.conversation_ids:
+        return None
+    return f"/conversations/{rng.choice(user.conversation_ids)}/"
+
+
+def _message_search(data, user, rng) -> str:
+    return f"/api/messages/search/?q={rng.choice(SEARCH_TERMS)}"
+
+
+def _message_form(rng: random.Random) -> Dict[str, str]:
+    return {"message_text": f"Load test message {rng.randrange(10**6)}"}
+
+
+# Read-heavy, roughly like the frontend. Admin, export, the SSE stream and
+# flows that send e-mail or delete data are left out.
+ENDPOINTS: Tuple[Endpoint, ...] = (
+    Endpoint("home", 2, _fixed("/")),
+    Endpoint("listings.browse", 15, _fixed("/listings/")),
+    Endpoint("listings.search", 10, _listing_search),
+    Endpoint("listings.detail", 15, _listing_detail),
+    Endpoint("api.listings.search", 8, _api_listing_search),
+    Endpoint("api.listings.detail", 5, _api_listing_detail),
+    Endpoint("profile", 2, _fixed("/profile/")),
+    Endpoint("matches.page", 4, _fixed("/matches/")),
+    Endpoint("api.matches.top", 2, _fixed("/api/matches/top/?limit=20")),
+    Endpoint("conversations.list", 10, _fixed("/conversations/")),
+    Endpoint("conversations.detail", 10, _conversation),
+    Endpoint("messages.send", 4, _conversation, method="POST", form=_message_form),
+    Endpoint("messages.unread", 5, _fixed("/api/messages/unread/")),
+    Endpoint("messages.search", 3, _message_search),
+    Endpoint("auth.me", 5, _fixed("/api/auth/me/")),
+)
+
+
+class Recorder:
+    """Thread-safe per-endpoint samples: latency in seconds and status code."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[Tuple[float, int]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, elapsed: float, status: int) -> None:
+        with self._lock:
+            self.samples.setdefault(name, []).append((elapsed, status))
+
+
+class Session:
+    """One keep-alive connection with cookie handling, like a browser tab."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self.timeout = timeout
+        self.connection = None
+        self.login_page = resolve_url(settings.LOGIN_URL)
+
+    def request(self, user: VirtualUser, method: str, path: str, body=None, content_type=None) -> int:
+        headers = {"Accept": "text/html,application/json"}
+        if user.cookies:
+            headers["Cookie"] = "; ".join(f"{key}={value}" for key, value in user.cookies.items())
+        if method != "GET" and "csrftoken" in user.cookies:
+            headers["X-CSRFToken"] = user.cookies["csrftoken"]
+        if body is not None:
+            headers["Content-Type"] = content_type
+
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                response.read()
+            except (ConnectionError, http.client.HTTPException):
+                # The server closed an idle keep-alive connection; retry once.
+                self.close()
+                if attempt == 2:
+                    raise
+                continue
+            for header in response.headers.get_all("Set-Cookie") or []:
+                for key, morsel in SimpleCookie(header).items():
+                    user.cookies[key] = morsel.value
+            if response.getheader("Connection", "").lower() == "close":
+                self.close()
+            location = urlsplit(response.getheader("Location", "")).path
+            if response.status in (301, 302) and location == self.login_page:
+                return 401  # Bounced to the login page: the session was lost.
+            return response.status
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def load_test_data(user_count: int) -> Tuple[LoadTestData, List[VirtualUser]]:
+    """Benchmark users with their conversations, and the active listing ids to browse."""
+    emails = list(benchmark_users().order_by("pk").values_list("pk", "email")[:user_count])
+    user_ids = [pk for pk, _ in emails]
+    conversations: Dict[int, List[int]] = {pk: [] for pk in user_ids}
+    for conversation_id, user1_id, user2_id in Conversation.objects.filter(
+        Q(user1_id__in=user_ids) | Q(user2_id__in=user_ids)
+    ).values_list("conversation_id", "user1_id", "user2_id"):
+        for user_id in (user1_id, user2_id):
+            if user_id in conversations:
+                conversations[user_id].append(conversation_id)
+
+    listing_ids = list(
+        Listing.objects.filter(is_active=True).order_by("-listing_id").values_list("listing_id", flat=True)[:1000]
+    )
+    users = [VirtualUser(email=email, conversation_ids=conversations[pk]) for pk, email in emails]
+    return LoadTestData(listing_ids=listing_ids), users
+
+
+def run_load_test(
+    base_url: str,
+    users: List[VirtualUser],
+    data: LoadTestData,
+    duration: float,
+    endpoints: Sequence[Endpoint] = ENDPOINTS,
+    think_time: float = 0.0,
+    timeout: float = 30.0,
+    seed: int = 491,
+) -> Dict[str, object]:
+    """
+    Logs every user in, then runs the weighted mix for ``duration`` seconds
+    with one thread per user. Returns the report (see ``summarize``).
+    """
+    recorder = Recorder()
+    weights = [endpoint.weight for endpoint in endpoints]
+    window = {}
+
+    def open_window():
+        window["start"] = time.monotonic()
+        window["deadline"] = window["start"] + duration
+
+    # Logins are reported but not part of the timed window, which opens once
+    # every user has logged in.
+    logged_in = threading.Barrier(len(users), action=open_window)
+
+    def virtual_user(index: int, user: VirtualUser) -> None:
+        rng = random.Random(seed + index)
+        session = Session(base_url, timeout)
+        body = json.dumps({"email": user.email, "password": BENCHMARK_PASSWORD})
+        _timed(recorder, "auth.login", session, user, "POST", LOGIN_PATH, body, "application/json")
+        logged_in.wait()
+        try:
+            while time.monotonic() < window["deadline"]:
+                endpoint = rng.choices(endpoints, weights)[0]
+                path = endpoint.path(data, user, rng)
+                if path is None:
+                    continue
+                body = urlencode(endpoint.form(rng)) if endpoint.form else None
+                _timed(
+                    recorder,
+                    endpoint.name,
+                    session,
+                    user,
+                    endpoint.method,
+                    path,
+                    body,
+                    "application/x-www-form-urlencoded",
+                )
+                if think_time:
+                    time.sleep(rng.expovariate(1 / think_time))
+        finally:
+            session.close()
+
+    threads = [
+        threading.Thread(target=virtual_user, args=(index, user), daemon=True)
+        for index, user in enumerate(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - window["start"]
+    return summarize(recorder, elapsed, base_url=base_url, users=len(users))
+
+
+def _timed(recorder, name, session, user, method, path, body, content_type) -> None:
+    start = time.perf_counter()
+    try:
+        status = session.request(user, method, path, body, content_type)
+    except (OSError, http.client.HTTPException):
+        status = 0  # Connection error or timeout.
+    recorder.add(name, time.perf_counter() - start, status)
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float, **meta) -> Dict[str, object]:
+    """Per-endpoint and overall RPS, error rate and latency percentiles (ms)."""
+
+    def stats(samples: List[Tuple[float, int]], window: float | None) -> Dict[str, object]:
+        latencies = sorted(latency * 1000 for latency, _ in samples)
+        statuses: Dict[str, int] = {}
+        for _, status in samples:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        # Redirects count as success: form posts answer with 302.
+        errors = sum(1 for _, status in samples if not 200 <= status < 400)
+        return {
+            "requests": len(samples),
+            "rps": round(len(samples) / window, 2) if window else None,
+            "errors": errors,
+            "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+            "status_codes": statuses,
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+                "p50": round(percentile(latencies, 0.50), 2),
+                "p95": round(percentile(latencies, 0.95), 2),
+                "p99": round(percentile(latencies, 0.99), 2),
+                "max": round(latencies[-1], 2) if latencies else 0.0,
+            },
+        }
+
+    endpoints = {
+        name: stats(samples, None if name == "auth.login" else elapsed)
+        for name, samples in sorted(recorder.samples.items())
+    }
+    timed = [
+        sample
+        for name, samples in recorder.samples.items()
+        if name != "auth.login"
+        for sample in samples
+    ]
+    return {
+        **meta,
+        "duration_seconds": round(elapsed, 2),
+        "total": stats(timed, elapsed),
+        "endpoints": endpoints,
+    }
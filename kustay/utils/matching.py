@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Tuple
+from typing import Dict, Iterator, Tuple
 
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models import Q, QuerySet
+from django.db.models import QuerySet, Value
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.utils import timezone
 
-from ..models import BlockedUser, MatchCompatibility, Profile
+from ..models import MatchCompatibility, Notification, Profile, UserMatch
+from .blocking import BlockedPairIndex, get_blocked_index
+from .budget_index import BudgetIntervalIndex
+from .notifications import NotificationEvent, notify
 
 # Weighting model inspired by qualitative roommate research.
 COMPONENT_WEIGHTS = {
@@ -24,12 +28,13 @@ BUDGET_MAX_FALLBACK = Decimal("100000")
 MIN_SCORE_TO_STORE = 10  # Low-feasibility matches are skipped.
 
 
-def get_candidate_users(for_user) -> QuerySet:
+def get_candidate_users(for_user, blocked_index: BlockedPairIndex | None = None) -> QuerySet:
     """
     Returns verified users with a profile that pass hard constraints.
     Filters:
         * No self-match.
-        * Exclude blocked users (both directions).
+        * Exclude blocked users (both directions), looked up in the blocked-pair
+          index instead of querying BlockedUser per requester.
         * Require overlapping budget bands when available.
         * Hook for future campus/city filters via `feasibility_filters`.
     """
@@ -45,24 +50,21 @@ def get_candidate_users(for_user) -> QuerySet:
         .select_related("profile")
     )
 
-    blocked_pairs = BlockedUser.objects.filter(
-        Q(blocker=for_user) | Q(blocked=for_user)
-    ).values_list("blocker_id", "blocked_id")
-    blocked_ids = {
-        user_id
-        for pair in blocked_pairs
-        for user_id in pair
-        if user_id is not None and user_id != for_user.pk
-    }
+    if blocked_index is None:
+        blocked_index = get_blocked_index(for_user.pk)
+    blocked_ids = blocked_index.blocked_ids(for_user.pk)
     if blocked_ids:
         base_qs = base_qs.exclude(pk__in=blocked_ids)
 
     user_min, user_max = _normalize_budget_range(requester_profile)
     # Require budget overlap only when the requester provided a bounded range.
     if user_min is not None and user_max is not None and user_max < BUDGET_MAX_FALLBACK:
-        base_qs = base_qs.filter(
-            profile__budget_max__gte=user_min,
-            profile__budget_min__lte=user_max,
+        # Compare normalized ranges, exactly as BudgetIntervalIndex.query does
+        # for calculate_all_matches, so both paths select the same candidates.
+        budget_low, budget_high = _normalized_budget_bounds("profile__")
+        base_qs = base_qs.alias(budget_low=budget_low, budget_high=budget_high).filter(
+            budget_high__gte=user_min,
+            budget_low__lte=user_max,
         )
 
     # Placeholder for future feasibility hooks (campus/city, etc.)
@@ -73,12 +75,13 @@ def get_candidate_users(for_user) -> QuerySet:
 
 
 def compute_compatibility(
-    profile1: Profile, profile2: Profile
+    profile1: Profile, profile2: Profile, budget_overlap: Decimal | None = None
 ) -> Tuple[int, Dict[str, Dict[str, object]]]:
     """
     Deterministic compatibility score between two profiles with an explainable breakdown.
     Scores are capped to [0, 100] and leverage content-based heuristics so ML/CF models
     can be layered in later without touching call sites.
+    `budget_overlap` may carry the overlap already reported by a budget index.
     """
     breakdown: Dict[str, Dict[str, object]] = {}
     total_score = 0
@@ -107,7 +110,7 @@ def compute_compatibility(
     }
     total_score += room_score
 
-    budget_score, budget_reason = _score_budget(profile1, profile2)
+    budget_score, budget_reason = _score_budget(profile1, profile2, overlap=budget_overlap)
     breakdown["budget"] = {
         "score": budget_score,
         "weight": COMPONENT_WEIGHTS["budget"],
@@ -139,9 +142,14 @@ def compute_compatibility(
     return final_score, breakdown
 
 
-def calculate_matches_for_user(user) -> int:
+def calculate_matches_for_user(
+    user,
+    blocked_index: BlockedPairIndex | None = None,
+    budget_index: BudgetIntervalIndex | None = None,
+) -> int:
     """
     Calculates or refreshes match scores for a given user. Returns number of matches updated.
+    With a `budget_index` (see `calculate_all_matches`) candidates are selected in memory.
     """
     if not user.is_verified:
         return 0
@@ -150,30 +158,46 @@ def calculate_matches_for_user(user) -> int:
     if requester_profile is None:
         return 0
 
-    candidates = get_candidate_users(user)
+    if budget_index is None:
+        candidates = (
+            (_get_profile(candidate), None)
+            for candidate in get_candidate_users(user, blocked_index=blocked_index)
+        )
+    else:
+        candidates = _indexed_candidates(
+            user, requester_profile, budget_index, blocked_index or get_blocked_index(user.pk)
+        )
     updated = 0
+    directed = []
+    events = []
 
-    for candidate in candidates:
-        candidate_profile = _get_profile(candidate)
+    for candidate_profile, budget_overlap in candidates:
         if candidate_profile is None:
             continue
 
-        score, breakdown = compute_compatibility(requester_profile, candidate_profile)
+        score, breakdown = compute_compatibility(
+            requester_profile, candidate_profile, budget_overlap=budget_overlap
+        )
         if score < MIN_SCORE_TO_STORE:
             continue
 
-        user_low, user_high = sorted([user, candidate], key=lambda u: u.pk)
-        MatchCompatibility.objects.update_or_create(
-            user1=user_low,
-            user2=user_high,
+        user_low_id, user_high_id = sorted([user.pk, candidate_profile.user_id])
+        match, created = MatchCompatibility.objects.update_or_create(
+            user1_id=user_low_id,
+            user2_id=user_high_id,
             defaults={
                 "compatibility_score": _to_decimal(score),
                 "matching_criteria": breakdown,
                 "calculated_at": timezone.now(),
             },
         )
+        directed.extend(_directed_rows(match))
+        if created:
+            events.extend(_match_events(match))
         updated += 1
 
+    _save_directed_rows(directed)
+    notify(events)
     return updated
 
 
@@ -187,12 +211,106 @@ def calculate_all_matches() -> int:
         is_verified=True, profile__isnull=False
     ).select_related("profile")
 
+    # One blocked-pair snapshot and one budget index for the whole run instead
+    # of candidate queries per user.
+    blocked_index = BlockedPairIndex.load()
+    budget_index = BudgetIntervalIndex.for_profiles(
+        Profile.objects.filter(user__is_verified=True).iterator(chunk_size=2000)
+    )
+
     total = 0
     for user in eligible_users.iterator():
-        total += calculate_matches_for_user(user)
+        total += calculate_matches_for_user(
+            user, blocked_index=blocked_index, budget_index=budget_index
+        )
     return total
 
 
+def _indexed_candidates(
+    user,
+    requester_profile: Profile,
+    budget_index: BudgetIntervalIndex,
+    blocked_index: BlockedPairIndex,
+) -> Iterator[Tuple[Profile, Decimal]]:
+    """Same hard constraints as `get_candidate_users`, answered from the indexes."""
+    blocked_ids = blocked_index.blocked_ids(user.pk)
+    user_min, user_max = _normalize_budget_range(requester_profile)
+    if user_max < BUDGET_MAX_FALLBACK:
+        overlapping = budget_index.query(user_min, user_max)
+    else:
+        overlapping = budget_index.scan(user_min, user_max)
+
+    for candidate_profile, overlap in overlapping:
+        if candidate_profile.user_id == user.pk or candidate_profile.user_id in blocked_ids:
+            continue
+        yield candidate_profile, overlap
+
+
+def get_top_matches(user, limit: int = 20) -> QuerySet:
+    """
+    Best matches for ``user`` with verified, profiled partners, read from the
+    directed match table (one index range scan regardless of pair order).
+    """
+    return (
+        UserMatch.objects.filter(
+            user=user,
+            partner__is_verified=True,
+            partner__profile__isnull=False,
+        )
+        .select_related("partner__profile", "match")
+        .order_by("-compatibility_score", "-calculated_at")[:limit]
+    )
+
+
+def _directed_rows(match: MatchCompatibility) -> list[UserMatch]:
+    return [
+        UserMatch(
+            user_id=user_id,
+            partner_id=partner_id,
+            match=match,
+            compatibility_score=match.compatibility_score,
+            calculated_at=match.calculated_at,
+        )
+        for user_id, partner_id in (
+            (match.user1_id, match.user2_id),
+            (match.user2_id, match.user1_id),
+        )
+    ]
+
+
+def _match_events(match: MatchCompatibility) -> list[NotificationEvent]:
+    content = f"New roommate match: {int(match.compatibility_score)}% compatible."
+    return [
+        NotificationEvent(
+            user_id=user_id,
+            notification_type=Notification.NotificationType.MATCH,
+            content=content,
+            related_id=match.pk,
+        )
+        for user_id in (match.user1_id, match.user2_id)
+    ]
+
+
+def save_directed_matches(matches) -> None:
+    """Writes both directed rows for each of ``matches`` (insert or refresh)."""
+    rows = []
+    for match in matches:
+        rows.extend(_directed_rows(match))
+    _save_directed_rows(rows)
+
+
+def _save_directed_rows(rows: list[UserMatch]) -> None:
+    if not rows:
+        return
+    UserMatch.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["user", "partner"],
+        update_fields=["match", "compatibility_score", "calculated_at"],
+    )
+
+
 # --- Scoring helpers ----------------------------------------------------- #
 
 
@@ -252,11 +370,14 @@ def _score_room_type(profile1: Profile, profile2: Profile) -> Tuple[int, str]:
     return score, reason
 
 
-def _score_budget(profile1: Profile, profile2: Profile) -> Tuple[int, str]:
+def _score_budget(
+    profile1: Profile, profile2: Profile, overlap: Decimal | None = None
+) -> Tuple[int, str]:
     weight = COMPONENT_WEIGHTS["budget"]
     range1 = _normalize_budget_range(profile1)
     range2 = _normalize_budget_range(profile2)
-    overlap = _budget_overlap(range1, range2)
+    if overlap is None:
+        overlap = _budget_overlap(range1, range2)
 
     if overlap <= 0:
         return 0, "Budget ranges currently do not overlap."
@@ -335,6 +456,33 @@ def _normalize_budget_range(profile: Profile) -> Tuple[Decimal, Decimal]:
     return min_val, max_val
 
 
+def _normalized_budget_bounds(prefix: str = "") -> Tuple[models.Func, models.Func]:
+    """SQL expressions for the bounds `_normalize_budget_range` returns."""
+    decimal_field = models.DecimalField(max_digits=12, decimal_places=2)
+    min_val = Greatest(
+        Coalesce(f"{prefix}budget_min", Value(Decimal("0")), output_field=decimal_field),
+        Value(Decimal("0")),
+        output_field=decimal_field,
+    )
+    raw_max = Coalesce(f"{prefix}budget_max", Value(Decimal("0")), output_field=decimal_field)
+    max_val = models.Case(
+        models.When(
+            models.Q(**{f"{prefix}budget_max__gt": 0}),
+            then=raw_max,
+        ),
+        models.When(
+            models.Q(**{f"{prefix}budget_min__gt": 0}),
+            then=min_val,
+        ),
+        default=Value(BUDGET_MAX_FALLBACK),
+        output_field=decimal_field,
+    )
+    return (
+        Least(min_val, max_val, output_field=decimal_field),
+        Greatest(min_val, max_val, output_field=decimal_field),
+    )
+
+
 def _budget_overlap(range1: Tuple[Decimal, Decimal], range2: Tuple[Decimal, Decimal]) -> Decimal:
     lower_bound = max(range1[0], range2[0])
     upper_bound = min(range1[1], range2[1])
@@ -0,0 +1,134 @@
+"""
+Moves old messages out of the hot ``Message`` table into ``ArchivedMessage``.
+
+Conversation pages are read newest first from both tables, so archiving is
+invisible to readers while hot-path queries, vacuum and index maintenance only
+deal with recent rows.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+
+from ..models import ArchivedMessage, Conversation, Message, Report
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 180
+DEFAULT_BATCH_SIZE = 5000
+THREAD_PAGE_SIZE = 50
+
+ARCHIVED_FIELDS = [
+    "message_id",
+    "sender_id",
+    "receiver_id",
+    "conversation_id",
+    "listing_id",
+    "message_text",
+    "is_read",
+    "sent_at",
+    "read_at",
+]
+
+
+def archive_messages(
+    cutoff: datetime,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+) -> int:
+    """
+    Moves messages sent before ``cutoff`` to the archive, one transaction per
+    batch. Messages referenced by a report stay in place so moderation keeps
+    working. Returns the number of messages moved (or that would be moved).
+    """
+    candidates = (
+        Message.objects.filter(sent_at__lt=cutoff, reports__isnull=True)
+        .order_by("message_id")
+        .values_list("message_id", flat=True)
+    )
+    if dry_run:
+        return candidates.count()
+
+    moved = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            ids = list(candidates.filter(message_id__gt=last_id)[:batch_size])
+            if not ids:
+                break
+            rows = Message.objects.filter(message_id__in=ids).values(*ARCHIVED_FIELDS)
+            ArchivedMessage.objects.bulk_create(
+                [ArchivedMessage(**row) for row in rows],
+                ignore_conflicts=True,
+            )
+            Message.objects.filter(message_id__in=ids).delete()
+        moved += len(ids)
+        last_id = ids[-1]
+    return moved
+
+
+def thread_page(
+    conversation: Conversation,
+    before: int | None = None,
+    limit: int = THREAD_PAGE_SIZE,
+) -> List[Message | ArchivedMessage]:
+    """
+    Up to ``limit`` messages of ``conversation`` older than message id
+    ``before`` (newest first), merged from the hot table and the archive.
+    """
+    hot = Message.objects.filter(conversation=conversation)
+    archived = ArchivedMessage.objects.filter(conversation=conversation)
+    if before is not None:
+        hot = hot.filter(message_id__lt=before)
+        archived = archived.filter(message_id__lt=before)
+
+    # Reported messages are never archived, so hot rows can be older than
+    # archived ones; both sides are read and merged by id.
+    page = list(hot.select_related("sender").order_by("-sent_at", "-message_id")[:limit])
+    page.extend(archived.select_related("sender").order_by("-message_id")[:limit])
+    page.sort(key=lambda message: message.pk, reverse=True)
+    return page[:limit]
+
+
+def latest_messages(conversation_ids: Iterable[int]) -> Dict[int, Message | ArchivedMessage]:
+    """
+    The newest message of each conversation, keyed by conversation id: one
+    query on the hot table, plus one on the archive for the conversations it
+    may still hold the newest message of (no hot rows, or only a reported
+    one, which is never archived and can therefore be older).
+    """
+    conversation_ids = list(conversation_ids)
+    hot = Message.objects.filter(
+        pk__in=_last_message_ids(
+            conversation_ids,
+            Message.objects.order_by("-sent_at", "-message_id"),
+        )
+    ).annotate(reported=Exists(Report.objects.filter(reported_message=OuterRef("pk"))))
+    latest = {message.conversation_id: message for message in hot.select_related("sender")}
+
+    unsettled = [
+        conversation_id
+        for conversation_id in conversation_ids
+        if conversation_id not in latest or latest[conversation_id].reported
+    ]
+    if unsettled:
+        archived = ArchivedMessage.objects.filter(
+            pk__in=_last_message_ids(unsettled, ArchivedMessage.objects.order_by("-message_id"))
+        )
+        for message in archived.select_related("sender"):
+            current = latest.get(message.conversation_id)
+            if current is None or message.pk > current.pk:
+                latest[message.conversation_id] = message
+    return latest
+
+
+def _last_message_ids(conversation_ids: List[int], ordered_messages):
+    """Subquery of the first message per conversation, one index probe each."""
+    return (
+        Conversation.objects.filter(pk__in=conversation_ids)
+        .annotate(
+            last_id=Subquery(ordered_messages.filter(conversation=OuterRef("pk")).values("pk")[:1])
+        )
+        .values("last_id")
+    )
@@ -0,0 +1,78 @@
+"""
+Full-text search over message text.
+
+Matching uses the same ``to_tsvector`` expression as the GIN index declared on
+``Message``, so searches never fall back to scanning message text. Results are
+newest first and paged with a ``message_id`` cursor.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery
+from django.db.models import Q, QuerySet
+from django.utils.html import escape
+
+from ..models import MESSAGE_SEARCH_CONFIG, MESSAGE_SEARCH_VECTOR, Message
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Control characters never appear in stored text, so the snippet can be
+# HTML-escaped before the markers are turned into <mark> tags.
+_START_SEL = "\x02"
+_STOP_SEL = "\x03"
+
+
+def build_search_query(term: str) -> SearchQuery:
+    """Parses ``term`` like a web search box (quotes, ``or``, ``-word``)."""
+    return SearchQuery(term, config=MESSAGE_SEARCH_CONFIG, search_type="websearch")
+
+
+def filter_messages(queryset: QuerySet, term: str) -> QuerySet:
+    """Restricts ``queryset`` to messages matching ``term`` using the GIN index."""
+    return queryset.alias(search=MESSAGE_SEARCH_VECTOR).filter(search=build_search_query(term))
+
+
+def search_messages(
+    user,
+    term: str,
+    before: int | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Dict[str, object]], int | None]:
+    """
+    Messages matching ``term`` in conversations ``user`` takes part in, with
+    a highlighted snippet each. Returns the page and the cursor for the next
+    one (``None`` on the last page).
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    queryset = filter_messages(
+        Message.objects.filter(Q(conversation__user1=user) | Q(conversation__user2=user)),
+        term,
+    )
+    if before is not None:
+        queryset = queryset.filter(message_id__lt=before)
+
+    rows = list(
+        queryset.annotate(
+            snippet=SearchHeadline(
+                "message_text",
+                build_search_query(term),
+                config=MESSAGE_SEARCH_CONFIG,
+                start_sel=_START_SEL,
+                stop_sel=_STOP_SEL,
+                max_words=25,
+                min_words=8,
+            )
+        )
+        .order_by("-message_id")
+        .values("message_id", "conversation_id", "sender_id", "sent_at", "snippet")[: limit + 1]
+    )
+
+    next_cursor = rows[limit - 1]["message_id"] if len(rows) > limit else None
+    results = rows[:limit]
+    for row in results:
+        row["snippet"] = (
+            escape(row["snippet"]).replace(_START_SEL, "<mark>").replace(_STOP_SEL, "</mark>")
+        )
+    return results, next_cursor
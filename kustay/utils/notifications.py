@@ -0,0 +1,197 @@
+"""
+Batched notification fan-out.
+
+Call sites hand a list of events to ``notify`` and return immediately; the
+events are written after the surrounding transaction commits, off the request
+path, with one ``bulk_create`` for new rows. Events of the same type for the
+same user within ``NOTIFICATION_COLLAPSE_WINDOW`` seconds are folded into one
+unread row whose ``event_count`` grows ("5 new matches").
+
+Unread notifications are also queued as one digest e-mail per user by the
+``send_notification_digests`` command.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Notification
+from .background import run_in_background
+from .events import publish_event
+from .outbound_email import enqueue_emails
+
+NotificationType = Notification.NotificationType
+
+DIGEST_BATCH_SIZE = 200
+DIGEST_SUBJECT = "Your KUstay updates"
+
+# Content used once several events have been collapsed into one row.
+COLLAPSED_CONTENT = {
+    NotificationType.MESSAGE: "{count} new messages",
+    NotificationType.MATCH: "{count} new matches",
+    NotificationType.REVIEW: "{count} review updates",
+    NotificationType.LISTING: "{count} listing updates",
+    NotificationType.SYSTEM: "{count} new notifications",
+}
+
+
+@dataclass(frozen=True)
+class NotificationEvent:
+    user_id: int
+    notification_type: str
+    content: str
+    related_id: int | None = None
+
+
+def notify(events: Iterable[NotificationEvent]) -> None:
+    """Queues ``events`` to be written once the current transaction commits."""
+    events = list(events)
+    if events:
+        run_in_background(write_notifications, events)
+
+
+def write_notifications(events: List[NotificationEvent]) -> int:
+    """
+    Writes ``events``, collapsing them per (user, type) within the batch and
+    into recent unread rows. Returns the number of rows created.
+    """
+    grouped: Dict[Tuple[int, str], List[NotificationEvent]] = {}
+    for event in events:
+        grouped.setdefault((event.user_id, event.notification_type), []).append(event)
+
+    window_start = timezone.now() - timedelta(seconds=settings.NOTIFICATION_COLLAPSE_WINDOW)
+    with transaction.atomic():
+        open_rows = _open_notifications(grouped, window_start)
+        new_rows = []
+        for key, batch in grouped.items():
+            existing = open_rows.get(key)
+            if existing is None:
+                new_rows.append(
+                    Notification(
+                        user_id=key[0],
+                        notification_type=key[1],
+                        content=_content(key[1], batch, len(batch)),
+                        related_id=batch[-1].related_id,
+                        event_count=len(batch),
+                    )
+                )
+                continue
+            existing.event_count += len(batch)
+            existing.content = _content(key[1], batch, existing.event_count)
+            existing.related_id = batch[-1].related_id
+            Notification.objects.filter(pk=existing.pk).update(
+                event_count=F("event_count") + len(batch),
+                content=existing.content,
+                related_id=existing.related_id,
+                updated_at=timezone.now(),
+            )
+            _publish(existing)
+        for row in Notification.objects.bulk_create(new_rows, batch_size=1000):
+            _publish(row)
+    return len(new_rows)
+
+
+def _publish(notification: Notification) -> None:
+    publish_event(
+        notification.user_id,
+        "notification",
+        {
+            "notification_id": notification.pk,
+            "notification_type": notification.notification_type,
+            "content": notification.content,
+            "event_count": notification.event_count,
+            "related_id": notification.related_id,
+        },
+    )
+
+
+def _open_notifications(grouped, window_start) -> Dict[Tuple[int, str], Notification]:
+    """Most recent unread, not yet e-mailed row per (user, type) in the window."""
+    rows = (
+        Notification.objects.filter(
+            user_id__in={user_id for user_id, _ in grouped},
+            notification_type__in={notification_type for _, notification_type in grouped},
+            is_read=False,
+            emailed_at__isnull=True,
+            created_at__gte=window_start,
+        )
+        .order_by("created_at")
+        .only("notification_id", "user_id", "notification_type", "event_count", "related_id")
+    )
+    latest = {}
+    for row in rows:
+        key = (row.user_id, row.notification_type)
+        if key in grouped:
+            latest[key] = row  # Ordered by age, so the newest row wins.
+    return latest
+
+
+def _content(notification_type: str, batch: List[NotificationEvent], count: int) -> str:
+    if count == 1:
+        return batch[-1].content
+    return COLLAPSED_CONTENT[notification_type].format(count=count)
+
+
+def send_notification_digests(
+    older_than: timedelta = timedelta(0),
+    batch_size: int = DIGEST_BATCH_SIZE,
+) -> Tuple[int, int]:
+    """
+    Queues one digest e-mail per user covering their unread, not yet e-mailed
+    notifications created at least ``older_than`` ago, ``batch_size`` users
+    per insert. Returns ``(digests queued, notifications included)``.
+    """
+    pending = (
+        Notification.objects.filter(
+            is_read=False,
+            emailed_at__isnull=True,
+            created_at__lte=timezone.now() - older_than,
+        )
+        .exclude(user__email="")
+        .order_by("user_id", "notification_id")
+        .values_list("notification_id", "user_id", "user__email", "content")
+    )
+
+    queued = included = 0
+    batch: List[Tuple[Dict[str, object], List[int]]] = []
+    current_user = None
+    for notification_id, user_id, email, content in pending.iterator(chunk_size=2000):
+        if user_id != current_user:
+            if len(batch) >= batch_size:
+                queued_now, included_now = _queue_digest_batch(batch)
+                queued += queued_now
+                included += included_now
+                batch = []
+            current_user = user_id
+            batch.append((_digest_message(email), []))
+        message, notification_ids = batch[-1]
+        message["body"] += f"- {content}\n"
+        notification_ids.append(notification_id)
+
+    if batch:
+        queued_now, included_now = _queue_digest_batch(batch)
+        queued += queued_now
+        included += included_now
+    return queued, included
+
+
+def _digest_message(email: str) -> Dict[str, object]:
+    return {
+        "subject": DIGEST_SUBJECT,
+        "body": "Here is what happened since your last visit:\n\n",
+        "to": [email],
+    }
+
+
+def _queue_digest_batch(batch: List[Tuple[Dict[str, object], List[int]]]) -> Tuple[int, int]:
+    notification_ids = [pk for _, ids in batch for pk in ids]
+    with transaction.atomic():
+        queued = enqueue_emails(message for message, _ in batch)
+        Notification.objects.filter(pk__in=notification_ids).update(emailed_at=timezone.now())
+    return queued, len(notification_ids)
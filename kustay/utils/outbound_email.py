@@ -0,0 +1,145 @@
+"""
+Outbound e-mail queue.
+
+``enqueue_email`` stores the message and returns; delivery happens after
+commit on the background executor and in the ``send_queued_email`` worker.
+Each batch reuses one backend connection. Failures are retried with
+exponential backoff, and after ``EMAIL_QUEUE_MAX_ATTEMPTS`` the message is
+marked dead and left for inspection in the admin.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import OutboundEmail
+from .background import run_in_background
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+
+def enqueue_email(subject: str, body: str, to: List[str], from_email: str | None = None) -> OutboundEmail:
+    """Queues one message and schedules a delivery run after commit."""
+    email = OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        to=list(to),
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+    run_in_background(send_queued_email)
+    return email
+
+
+def enqueue_emails(messages: Iterable[Dict[str, object]]) -> int:
+    """Queues many ``subject``/``body``/``to`` dicts with one insert."""
+    rows = [
+        OutboundEmail(
+            subject=message["subject"],
+            body=message["body"],
+            to=list(message["to"]),
+            from_email=message.get("from_email") or settings.DEFAULT_FROM_EMAIL,
+        )
+        for message in messages
+    ]
+    OutboundEmail.objects.bulk_create(rows, batch_size=1000)
+    if rows:
+        run_in_background(send_queued_email)
+    return len(rows)
+
+
+def send_queued_email(batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Delivers due messages until none are left. Rows are claimed with
+    ``SKIP LOCKED`` and leased (see ``_claim_batch``) so concurrent workers
+    never send the same message twice.
+    Returns counts of sent, retried and dead messages.
+    """
+    totals = {"sent": 0, "retried": 0, "dead": 0}
+    while True:
+        result = _send_batch(batch_size)
+        for key, value in result.items():
+            totals[key] += value
+        if sum(result.values()) < batch_size:
+            return totals
+
+
+def _send_batch(batch_size: int) -> Dict[str, int]:
+    counts = {"sent": 0, "retried": 0, "dead": 0}
+    batch = _claim_batch(batch_size)
+    if not batch:
+        return counts
+
+    # Sent outside any transaction: each result is saved on its own, so a
+    # failure mid-batch never rolls back messages that were already delivered.
+    try:
+        connection = get_connection(timeout=settings.EMAIL_TIMEOUT)
+        connection.open()
+    except Exception as exc:
+        logger.warning("Could not open mail connection: %s", exc)
+        for email in batch:
+            counts[_record_failure(email, exc)] += 1
+        return counts
+
+    try:
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=email.to,
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as exc:
+                counts[_record_failure(email, exc)] += 1
+                continue
+            email.status = OutboundEmail.Status.SENT
+            email.attempts += 1
+            email.sent_at = timezone.now()
+            email.save(update_fields=["status", "attempts", "sent_at"])
+            counts["sent"] += 1
+    finally:
+        connection.close()
+    return counts
+
+
+def _claim_batch(batch_size: int) -> List[OutboundEmail]:
+    """
+    Claims due messages in a short transaction by moving ``next_attempt_at``
+    past ``EMAIL_QUEUE_CLAIM_SECONDS``, so no lock is held while sending.
+    """
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        if batch:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                next_attempt_at=timezone.now() + timedelta(seconds=settings.EMAIL_QUEUE_CLAIM_SECONDS)
+            )
+    return batch
+
+
+def _record_failure(email: OutboundEmail, exc: Exception) -> str:
+    email.attempts += 1
+    email.last_error = f"{type(exc).__name__}: {exc}"
+    if email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+        email.status = OutboundEmail.Status.DEAD
+        outcome = "dead"
+    else:
+        delay = timedelta(seconds=settings.EMAIL_QUEUE_RETRY_BASE_SECONDS * 2 ** (email.attempts - 1))
+        email.next_attempt_at = timezone.now() + min(delay, MAX_RETRY_DELAY)
+        outcome = "retried"
+    email.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+    return outcome
@@ -0,0 +1,127 @@
+"""
+Registry of hot queries whose plans must stay index-backed.
+
+Each entry mirrors a query issued by a view. ``check_query_plans`` runs
+``EXPLAIN`` for all of them against the benchmark dataset and reports any
+sequential scan.
+"""
+from __future__ import annotations
+
+import re
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+from django.db.models import Q, QuerySet
+
+from ..models import Conversation, Listing, Message, Notification
+from .benchmark import benchmark_users
+from .matching import get_top_matches
+from .message_search import filter_messages
+from .read_state import unread_counts_queryset
+from .recommendations import get_recommendations
+from .tokens import Purpose, token_lookup
+
+HOT_QUERIES: Dict[str, Callable[[dict], QuerySet]] = {}
+
+SEQ_SCAN = re.compile(r"Seq Scan on (\S+)")
+
+
+def hot_query(name: str):
+    """Registers ``func(sample) -> QuerySet`` as a hot query."""
+
+    def register(func):
+        HOT_QUERIES[name] = func
+        return func
+
+    return register
+
+
+def build_sample() -> dict:
+    """Picks representative rows from the benchmark dataset."""
+    users = benchmark_users().order_by("pk")
+    user = users[users.count() // 2]
+    conversation = (
+        Conversation.objects.filter(Q(user1=user) | Q(user2=user)).order_by("pk").first()
+    )
+    return {"user": user, "conversation": conversation}
+
+
+def find_sequential_scans(queryset: QuerySet) -> List[str]:
+    """Returns the tables the planner would scan sequentially for ``queryset``."""
+    return SEQ_SCAN.findall(queryset.explain())
+
+
+@hot_query("listings.recent")
+def _listings_recent(sample):
+    return Listing.objects.filter(is_active=True).order_by("-created_at")[:20]
+
+
+@hot_query("listings.rent_range")
+def _listings_rent_range(sample):
+    return Listing.objects.filter(
+        is_active=True,
+        rent_amount__gte=Decimal("12000"),
+        rent_amount__lte=Decimal("12500"),
+    ).order_by("-created_at")[:20]
+
+
+@hot_query("conversations.for_user")
+def _conversations_for_user(sample):
+    user = sample["user"]
+    return Conversation.objects.filter(Q(user1=user) | Q(user2=user)).order_by(
+        "-last_message_at", "-created_at"
+    )
+
+
+@hot_query("messages.thread")
+def _messages_thread(sample):
+    return Message.objects.filter(conversation=sample["conversation"]).order_by("sent_at")
+
+
+@hot_query("messages.last_in_thread")
+def _messages_last_in_thread(sample):
+    return Message.objects.filter(conversation=sample["conversation"]).order_by("-sent_at")[:1]
+
+
+@hot_query("messages.unread_in_thread")
+def _messages_unread_in_thread(sample):
+    return Message.objects.filter(
+        conversation=sample["conversation"],
+        receiver=sample["user"],
+        is_read=False,
+    )
+
+
+@hot_query("messages.unread_counts")
+def _messages_unread_counts(sample):
+    return unread_counts_queryset(sample["user"])
+
+
+@hot_query("messages.search")
+def _messages_search(sample):
+    return filter_messages(Message.objects.all(), "flat").order_by("-message_id")[:20]
+
+
+@hot_query("notifications.unread")
+def _notifications_unread(sample):
+    return Notification.objects.filter(user=sample["user"], is_read=False).order_by("-created_at")[:20]
+
+
+@hot_query("notifications.recent")
+def _notifications_recent(sample):
+    return Notification.objects.filter(user=sample["user"]).order_by("-created_at")[:20]
+
+
+@hot_query("matches.top")
+def _matches_top(sample):
+    return get_top_matches(sample["user"], limit=20)
+
+
+@hot_query("listings.recommended")
+def _listings_recommended(sample):
+    return get_recommendations(sample["user"], limit=20)
+
+
+@hot_query("tokens.lookup")
+def _tokens_lookup(sample):
+    return token_lookup("not-a-real-token", Purpose.PASSWORD_RESET)
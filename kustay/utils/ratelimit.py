@@ -0,0 +1,159 @@
+"""
+Sliding-window rate limiting on top of the Django cache.
+
+Each limit keeps a counter per fixed window; the request rate is estimated by
+weighting the previous window's count by how much of it still overlaps the
+sliding window. Two cache reads and one increment per check, so it works the
+same on the local-memory cache and on a shared backend (``RATELIMIT_CACHE``).
+Over-limit requests are rejected before the view runs, e.g. before
+``authenticate()`` spends time on the password hasher.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import time
+from functools import wraps
+from typing import Callable, Iterable, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+RATE_PATTERN = re.compile(r"^(\d+)/(\d*)([smhd])$")
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """``"5/m"`` or ``"20/15m"`` to ``(limit, period_seconds)``."""
+    match = RATE_PATTERN.match(rate)
+    if not match:
+        raise ValueError(f"Invalid rate {rate!r}; expected e.g. '5/m' or '20/15m'.")
+    limit, multiplier, unit = match.groups()
+    return int(limit), int(multiplier or 1) * PERIODS[unit]
+
+
+class SlidingWindowLimit:
+    def __init__(self, scope: str, rate: str):
+        self.scope = scope
+        self.limit, self.period = parse_rate(rate)
+
+    def hit(self, key: str) -> int:
+        """
+        Counts one attempt for ``key``. Returns 0 if allowed, otherwise the
+        number of seconds to wait; rejected attempts are not counted.
+        """
+        cache = caches[getattr(settings, "RATELIMIT_CACHE", "default")]
+        now = time.time()
+        window = int(now // self.period)
+        elapsed = now - window * self.period
+        # Hashed so e-mail addresses make valid keys on every cache backend.
+        key = hashlib.sha256(key.encode()).hexdigest()[:32]
+        current_key = f"kustay:rl:{self.scope}:{key}:{window}"
+        previous_key = f"kustay:rl:{self.scope}:{key}:{window - 1}"
+
+        counts = cache.get_many([current_key, previous_key])
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        remaining_weight = (self.period - elapsed) / self.period
+        if previous * remaining_weight + current >= self.limit:
+            return self._retry_after(current, previous, elapsed)
+
+        cache.add(current_key, 0, timeout=self.period * 2)
+        try:
+            cache.incr(current_key)
+        except ValueError:  # Evicted between add() and incr().
+            cache.set(current_key, 1, timeout=self.period * 2)
+        return 0
+
+    def _retry_after(self, current: int, previous: int, elapsed: float) -> int:
+        until_next_window = self.period - elapsed
+        if current >= self.limit or not previous:
+            return max(1, math.ceil(until_next_window))
+        # Wait until enough of the previous window has slid out.
+        wait = until_next_window - (self.limit - current) * self.period / previous
+        return max(1, math.ceil(wait))
+
+
+def client_ip(request) -> str:
+    if getattr(settings, "RATELIMIT_TRUST_FORWARDED_FOR", False):
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "unknown")
+
+
+def _request_email(request) -> str | None:
+    data = getattr(request, "data", None)  # DRF request
+    if data is None:
+        data = request.POST
+    if not hasattr(data, "get"):
+        return None
+    # AuthenticationForm (the HTML and admin logins) posts the e-mail as "username".
+    email = data.get("email") or data.get("username")
+    return str(email).strip().lower() if email else None
+
+
+def _request_user(request) -> str:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    return f"ip:{client_ip(request)}"
+
+
+# Shared by every login form, so all of them draw from the same buckets.
+LOGIN_LIMITS = [("ip", "30/5m"), ("email", "5/5m")]
+
+
+KEY_FUNCTIONS: dict[str, Callable] = {
+    "ip": client_ip,
+    "email": _request_email,
+    "user": _request_user,
+}
+
+
+def ratelimit(
+    scope: str,
+    limits: Iterable[Tuple[str, str]],
+    methods: Iterable[str] = ("POST",),
+):
+    """
+    Rejects requests once any of ``limits`` is exceeded. Each limit is
+    ``(key, rate)`` where key is ``"ip"``, ``"email"`` (from the submitted
+    data) or ``"user"``; e.g. ``[("ip", "20/m"), ("email", "5/m")]``.
+    Apply it directly on the view function, below any ``@api_view``.
+    """
+    checks = [
+        (KEY_FUNCTIONS[key], SlidingWindowLimit(f"{scope}:{key}", rate))
+        for key, rate in limits
+    ]
+    methods = {method.upper() for method in methods}
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if getattr(settings, "RATELIMIT_ENABLED", True) and request.method in methods:
+                for key_function, limit in checks:
+                    key = key_function(request)
+                    if key is None:
+                        continue
+                    retry_after = limit.hit(key)
+                    if retry_after:
+                        return _limited_response(request, retry_after)
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _limited_response(request, retry_after: int) -> HttpResponse:
+    message = f"Too many attempts. Try again in {retry_after} seconds."
+    # DRF requests (API views) always get JSON.
+    if hasattr(request, "data") or not request.accepts("text/html"):
+        response = JsonResponse({"error": message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type="text/plain")
+    response["Retry-After"] = str(retry_after)
+    return response
@@ -0,0 +1,70 @@
+"""
+Per-participant read cursors for conversations.
+
+Each conversation stores the highest message id each participant has read, so
+marking a thread read is a single conditional update of one row and unread
+counts for a whole inbox come from one grouped query.
+"""
+from __future__ import annotations
+
+from typing import Dict
+
+from django.db.models import Count, F, Q, QuerySet
+from django.utils import timezone
+
+from ..models import Conversation, Message
+from .events import publish_event
+
+
+def mark_conversation_read(conversation: Conversation, user, up_to_message_id: int | None) -> bool:
+    """
+    Moves ``user``'s read cursor forward to ``up_to_message_id``. Returns
+    whether anything changed; an already-read thread issues no query at all.
+    """
+    field = conversation.last_read_field(user)
+    current = getattr(conversation, field)
+    if not up_to_message_id or up_to_message_id <= current:
+        return False
+
+    # Conditional so concurrent tabs never move the cursor backwards.
+    advanced = Conversation.objects.filter(
+        pk=conversation.pk, **{f"{field}__lt": up_to_message_id}
+    ).update(**{field: up_to_message_id})
+    setattr(conversation, field, up_to_message_id)
+    if not advanced:
+        return False
+
+    # Keep the per-message flag in step for the newly read range only.
+    conversation.messages.filter(
+        receiver=user,
+        is_read=False,
+        message_id__gt=current,
+        message_id__lte=up_to_message_id,
+    ).update(is_read=True, read_at=timezone.now())
+    publish_event(user.pk, "unread", {"conversation_id": conversation.pk, "unread": 0})
+    return True
+
+
+def unread_counts_queryset(user) -> QuerySet:
+    """``conversation_id``/``unread`` rows for conversations with unread messages."""
+    return (
+        Message.objects.filter(receiver=user)
+        .filter(
+            Q(
+                conversation__user1=user,
+                message_id__gt=F("conversation__user1_last_read_message_id"),
+            )
+            | Q(
+                conversation__user2=user,
+                message_id__gt=F("conversation__user2_last_read_message_id"),
+            )
+        )
+        .order_by()
+        .values("conversation_id")
+        .annotate(unread=Count("message_id"))
+    )
+
+
+def unread_counts(user) -> Dict[int, int]:
+    """Unread message count per conversation of ``user`` (zero counts omitted)."""
+    return {row["conversation_id"]: row["unread"] for row in unread_counts_queryset(user)}
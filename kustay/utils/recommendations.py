@@ -0,0 +1,452 @@
+"""
+Listing recommendations ("listings for you").
+
+``compute_listing_score`` rates a listing against a profile the way
+``compute_compatibility`` rates two profiles: weighted components with an
+explainable breakdown. Each user's best ``RECOMMENDATIONS_PER_USER`` listings
+are stored in ``ListingRecommendation`` and kept current incrementally:
+
+* a profile change recomputes that user's list;
+* a listing change rescores that one listing for every profile and only
+  touches the lists it enters, moves within or leaves;
+* lists that fall below ``REFILL_BELOW`` rows (listings deactivated or
+  deleted) are recomputed;
+* imported listings are merged into every list in one pass over the
+  profiles (``add_new_listings``).
+
+``recompute_all_recommendations`` rebuilds everything from one snapshot of
+the active listings.
+"""
+from __future__ import annotations
+
+import bisect
+import heapq
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, QuerySet, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from ..models import Listing, ListingRecommendation, Profile
+from .blocking import BlockedPairIndex, get_blocked_index
+from .matching import (
+    BUDGET_MAX_FALLBACK,
+    _format_decimal,
+    _normalize_budget_range,
+    _normalize_neighborhoods,
+    _to_decimal,
+)
+
+LISTING_COMPONENT_WEIGHTS = {
+    "budget": 40,
+    "location": 30,
+    "room_type": 20,
+    "move_in": 10,
+}
+
+RECOMMENDATIONS_PER_USER = 50
+# Serving reads at most this many, so shorter lists are refilled.
+REFILL_BELOW = 20
+MIN_SCORE_TO_STORE = 30
+# Listings more than 25% above the budget maximum are never recommended.
+BUDGET_TOLERANCE = Decimal("1.25")
+MOVE_IN_GRACE_DAYS = 60
+
+# Listing fields the score depends on; saves touching none of them are skipped.
+LISTING_SCORE_FIELDS = {"user", "is_active", "rent_amount", "neighborhood", "room_type", "available_from"}
+_LISTING_COLUMNS = ("listing_id", "user_id", *sorted(LISTING_SCORE_FIELDS - {"user"}))
+_PROFILE_COLUMNS = (
+    "user_id",
+    "budget_min",
+    "budget_max",
+    "preferred_neighborhoods",
+    "room_type_preference",
+    "move_in_date",
+)
+
+
+def compute_listing_score(profile: Profile, listing: Listing) -> Tuple[int, Dict[str, Dict[str, object]]]:
+    """
+    Deterministic fit of ``listing`` for ``profile`` in [0, 100] with an
+    explainable breakdown. Hard constraints are checked by ``is_eligible``.
+    """
+    breakdown: Dict[str, Dict[str, object]] = {}
+    total_score = 0
+
+    for component, scorer in (
+        ("budget", _score_rent),
+        ("location", _score_neighborhood),
+        ("room_type", _score_listing_room_type),
+        ("move_in", _score_move_in),
+    ):
+        score, reason = scorer(profile, listing)
+        breakdown[component] = {
+            "score": score,
+            "weight": LISTING_COMPONENT_WEIGHTS[component],
+            "reason": reason,
+        }
+        total_score += score
+
+    final_score = max(0, min(100, int(round(total_score))))
+    breakdown["total"] = {
+        "score": final_score,
+        "reason": "Weighted blend of budget fit, location, room type and move-in timing.",
+    }
+    return final_score, breakdown
+
+
+def is_eligible(profile: Profile, listing: Listing, blocked_ids: Iterable[int] = ()) -> bool:
+    """Hard constraints: active, not the user's own, no block, rent within tolerance."""
+    if not listing.is_active or listing.user_id == profile.user_id or listing.user_id in blocked_ids:
+        return False
+    _, budget_max = _normalize_budget_range(profile)
+    if budget_max >= BUDGET_MAX_FALLBACK:
+        return True
+    return _to_decimal(listing.rent_amount) <= budget_max * BUDGET_TOLERANCE
+
+
+def get_recommendations(user, limit: int = REFILL_BELOW) -> QuerySet:
+    """The user's stored recommendations, best first (one index range scan)."""
+    return (
+        ListingRecommendation.objects.filter(user=user, listing__is_active=True)
+        .select_related("listing__user")
+        .order_by("-score", "-calculated_at")[:limit]
+    )
+
+
+def recommend_for_user(
+    user_id: int,
+    listings: Sequence[Listing] | None = None,
+    blocked_index: BlockedPairIndex | None = None,
+) -> int:
+    """
+    Recomputes one user's list from ``listings`` (default: the active
+    listings within their budget). Returns the number of rows stored.
+    """
+    profile = Profile.objects.filter(user_id=user_id).only(*_PROFILE_COLUMNS).first()
+    if profile is None:
+        ListingRecommendation.objects.filter(user_id=user_id).delete()
+        return 0
+
+    blocked_ids = (blocked_index or get_blocked_index(user_id)).blocked_ids(user_id)
+    if listings is None:
+        listings = _candidate_listings(profile, blocked_ids)
+
+    scored = []
+    for listing in listings:
+        if not is_eligible(profile, listing, blocked_ids):
+            continue
+        score, breakdown = compute_listing_score(profile, listing)
+        if score >= MIN_SCORE_TO_STORE:
+            scored.append((score, listing.listing_id, breakdown))
+    top = heapq.nlargest(RECOMMENDATIONS_PER_USER, scored, key=lambda item: (item[0], item[1]))
+
+    now = timezone.now()
+    with transaction.atomic():
+        ListingRecommendation.objects.filter(user_id=user_id).exclude(
+            listing_id__in=[listing_id for _, listing_id, _ in top]
+        ).delete()
+        _upsert(
+            ListingRecommendation(
+                user_id=user_id,
+                listing_id=listing_id,
+                score=Decimal(score),
+                criteria=breakdown,
+                calculated_at=now,
+            )
+            for score, listing_id, breakdown in top
+        )
+    return len(top)
+
+
+def update_recommendations_for_listing(listing_id: int) -> int:
+    """
+    Rescores one listing for every profile and updates only the lists it
+    belongs in. Returns the number of lists changed.
+    """
+    listing = Listing.objects.filter(pk=listing_id).only(*_LISTING_COLUMNS).first()
+    current = {
+        user_id: (score, criteria)
+        for user_id, score, criteria in ListingRecommendation.objects.filter(
+            listing_id=listing_id
+        ).values_list("user_id", "score", "criteria")
+    }
+    if listing is None or not listing.is_active:
+        ListingRecommendation.objects.filter(listing_id=listing_id).delete()
+        refill_recommendations(current)
+        return len(current)
+
+    blocked_index = get_blocked_index()
+    now = timezone.now()
+    scored: Dict[int, Tuple[int, dict]] = {}
+    for profile in _profiles_within_budget(listing):
+        if not is_eligible(profile, listing, blocked_index.blocked_ids(profile.user_id)):
+            continue
+        score, breakdown = compute_listing_score(profile, listing)
+        if score >= MIN_SCORE_TO_STORE:
+            scored[profile.user_id] = (score, breakdown)
+
+    dropped = [user_id for user_id in current if user_id not in scored]
+    newcomers = [user_id for user_id in scored if user_id not in current]
+    lists = {
+        row["user_id"]: row
+        for row in ListingRecommendation.objects.filter(user_id__in=newcomers)
+        .values("user_id")
+        .annotate(count=Count("pk"), floor=Min("score"))
+    }
+    entering = [
+        user_id
+        for user_id in newcomers
+        if user_id not in lists
+        or lists[user_id]["count"] < RECOMMENDATIONS_PER_USER
+        or scored[user_id][0] > lists[user_id]["floor"]
+    ]
+    # The breakdown quotes rent, area and dates, so it can go stale at an unchanged score.
+    changed = [
+        user_id
+        for user_id in scored
+        if user_id in current and current[user_id] != (scored[user_id][0], scored[user_id][1])
+    ]
+
+    with transaction.atomic():
+        if dropped:
+            ListingRecommendation.objects.filter(listing_id=listing_id, user_id__in=dropped).delete()
+        _upsert(
+            ListingRecommendation(
+                user_id=user_id,
+                listing_id=listing_id,
+                score=Decimal(scored[user_id][0]),
+                criteria=scored[user_id][1],
+                calculated_at=now,
+            )
+            for user_id in entering + changed
+        )
+        _trim([user_id for user_id in entering if user_id in lists])
+    refill_recommendations(dropped)
+    return len(dropped) + len(entering) + len(changed)
+
+
+def add_new_listings(listing_ids: Iterable[int]) -> int:
+    """
+    Merges many new listings (e.g. an import) into every list in one pass over
+    the profiles, scoring each profile only against the new listings it can
+    afford. Returns the number of rows stored.
+    """
+    listings = sorted(
+        Listing.objects.filter(pk__in=list(listing_ids), is_active=True).only(*_LISTING_COLUMNS),
+        key=lambda listing: _to_decimal(listing.rent_amount),
+    )
+    if not listings:
+        return 0
+    rents = [_to_decimal(listing.rent_amount) for listing in listings]
+    lists = {
+        row["user_id"]: row
+        for row in ListingRecommendation.objects.values("user_id").annotate(
+            count=Count("pk"), floor=Min("score")
+        )
+    }
+    blocked_index = get_blocked_index()
+    now = timezone.now()
+    stored = 0
+    rows: List[ListingRecommendation] = []
+    overfull: List[int] = []
+
+    def flush():
+        with transaction.atomic():
+            _upsert(rows)
+            _trim(overfull)
+        rows.clear()
+        overfull.clear()
+
+    profiles = Profile.objects.order_by("user_id").only(*_PROFILE_COLUMNS)
+    for profile in profiles.iterator(chunk_size=2000):
+        _, budget_max = _normalize_budget_range(profile)
+        affordable = listings
+        if budget_max < BUDGET_MAX_FALLBACK:
+            affordable = listings[: bisect.bisect_right(rents, budget_max * BUDGET_TOLERANCE)]
+        blocked_ids = blocked_index.blocked_ids(profile.user_id)
+
+        scored = []
+        for listing in affordable:
+            if not is_eligible(profile, listing, blocked_ids):
+                continue
+            score, breakdown = compute_listing_score(profile, listing)
+            if score >= MIN_SCORE_TO_STORE:
+                scored.append((score, listing.listing_id, breakdown))
+
+        existing = lists.get(profile.user_id, {"count": 0, "floor": None})
+        top = heapq.nlargest(RECOMMENDATIONS_PER_USER, scored, key=lambda item: (item[0], item[1]))
+        entering = [
+            item
+            for item in top
+            if existing["count"] < RECOMMENDATIONS_PER_USER or item[0] > existing["floor"]
+        ]
+        rows.extend(
+            ListingRecommendation(
+                user_id=profile.user_id,
+                listing_id=listing_id,
+                score=Decimal(score),
+                criteria=breakdown,
+                calculated_at=now,
+            )
+            for score, listing_id, breakdown in entering
+        )
+        stored += len(entering)
+        if existing["count"] + len(entering) > RECOMMENDATIONS_PER_USER:
+            overfull.append(profile.user_id)
+        if len(rows) >= 5000:
+            flush()
+    flush()
+    return stored
+
+
+def refill_recommendations(user_ids: Iterable[int]) -> int:
+    """Recomputes the lists of ``user_ids`` that have fallen below ``REFILL_BELOW`` rows."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return 0
+    counts = dict(
+        ListingRecommendation.objects.filter(user_id__in=user_ids)
+        .values("user_id")
+        .annotate(count=Count("pk"))
+        .values_list("user_id", "count")
+    )
+    short = [user_id for user_id in user_ids if counts.get(user_id, 0) < REFILL_BELOW]
+    for user_id in short:
+        recommend_for_user(user_id)
+    return len(short)
+
+
+def recompute_all_recommendations() -> int:
+    """
+    Utility for cron/management commands. Rebuilds every profile's list from
+    one in-memory snapshot of the active listings. Returns rows stored.
+    """
+    listings = list(Listing.objects.filter(is_active=True).only(*_LISTING_COLUMNS))
+    blocked_index = BlockedPairIndex.load()
+    total = 0
+    for user_id in Profile.objects.order_by("user_id").values_list("user_id", flat=True).iterator():
+        total += recommend_for_user(user_id, listings=listings, blocked_index=blocked_index)
+    return total
+
+
+def _candidate_listings(profile: Profile, blocked_ids) -> QuerySet:
+    listings = (
+        Listing.objects.filter(is_active=True)
+        .exclude(user_id=profile.user_id)
+        .only(*_LISTING_COLUMNS)
+    )
+    if blocked_ids:
+        listings = listings.exclude(user_id__in=blocked_ids)
+    _, budget_max = _normalize_budget_range(profile)
+    if budget_max < BUDGET_MAX_FALLBACK:
+        listings = listings.filter(rent_amount__lte=budget_max * BUDGET_TOLERANCE)
+    return listings.iterator(chunk_size=2000)
+
+
+def _profiles_within_budget(listing: Listing) -> Iterable[Profile]:
+    """Profiles whose budget could admit the listing's rent (``is_eligible`` decides)."""
+    threshold = _to_decimal(listing.rent_amount) / BUDGET_TOLERANCE
+    return (
+        Profile.objects.filter(
+            Q(budget_max__gte=threshold) | Q(budget_min__gte=threshold) | Q(budget_max__lte=0)
+        )
+        .only(*_PROFILE_COLUMNS)
+        .iterator(chunk_size=2000)
+    )
+
+
+def _upsert(rows: Iterable[ListingRecommendation]) -> None:
+    rows = list(rows)
+    if rows:
+        ListingRecommendation.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["user", "listing"],
+            update_fields=["score", "criteria", "calculated_at"],
+        )
+
+
+def _trim(user_ids: List[int]) -> None:
+    """Deletes rows ranked below ``RECOMMENDATIONS_PER_USER`` in the given lists."""
+    if not user_ids:
+        return
+    ranked = ListingRecommendation.objects.filter(user_id__in=user_ids).annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=[F("user_id")],
+            order_by=[F("score").desc(), F("listing_id").desc()],
+        )
+    )
+    overflow = list(ranked.filter(rank__gt=RECOMMENDATIONS_PER_USER).values_list("pk", flat=True))
+    if overflow:
+        ListingRecommendation.objects.filter(pk__in=overflow).delete()
+
+
+# --- Scoring helpers ----------------------------------------------------- #
+
+
+def _score_rent(profile: Profile, listing: Listing) -> Tuple[int, str]:
+    weight = LISTING_COMPONENT_WEIGHTS["budget"]
+    budget_min, budget_max = _normalize_budget_range(profile)
+    rent = _to_decimal(listing.rent_amount)
+
+    if budget_max >= BUDGET_MAX_FALLBACK and budget_min == 0:
+        return int(round(weight * 0.5)), "You have not shared a budget yet."
+    if budget_min <= rent <= budget_max:
+        return weight, f"Rent of TRY {_format_decimal(rent)} is within your budget."
+    if rent < budget_min:
+        score = int(round(weight * 0.8))
+        return score, f"Rent of TRY {_format_decimal(rent)} is below your budget range."
+
+    over = float((rent - budget_max) / budget_max)
+    ceiling = float(BUDGET_TOLERANCE - 1)
+    score = int(round(weight * 0.5 * max(0.0, 1 - over / ceiling)))
+    reason = f"Rent is TRY {_format_decimal(rent - budget_max)} above your maximum."
+    return score, reason
+
+
+def _score_neighborhood(profile: Profile, listing: Listing) -> Tuple[int, str]:
+    weight = LISTING_COMPONENT_WEIGHTS["location"]
+    preferred = _normalize_neighborhoods(profile.preferred_neighborhoods)
+    neighborhood = (listing.neighborhood or "").strip()
+
+    if not preferred:
+        return int(round(weight * 0.4)), "You have not shared neighborhood preferences yet."
+    if not neighborhood:
+        return int(round(weight * 0.3)), "The listing does not name its neighborhood."
+    if neighborhood.lower() in preferred:
+        return weight, f"In {neighborhood}, one of your preferred neighborhoods."
+    return int(round(weight * 0.1)), f"{neighborhood} is outside your preferred neighborhoods."
+
+
+def _score_listing_room_type(profile: Profile, listing: Listing) -> Tuple[int, str]:
+    weight = LISTING_COMPONENT_WEIGHTS["room_type"]
+    preference = profile.room_type_preference or "private"
+    room_type = listing.room_type or "private"
+
+    if preference == room_type:
+        return weight, f"Offers the {room_type.replace('_', ' ')} setup you prefer."
+    if preference == "private" and room_type == "entire_place":
+        return int(round(weight * 0.6)), "An entire place gives you more privacy than you asked for."
+    if {"shared", "private"} == {preference, room_type}:
+        return int(round(weight * 0.4)), "Room type differs from your preference; workable if flexible."
+    return int(round(weight * 0.2)), "Room type may not suit your preference."
+
+
+def _score_move_in(profile: Profile, listing: Listing) -> Tuple[int, str]:
+    weight = LISTING_COMPONENT_WEIGHTS["move_in"]
+    move_in: date | None = profile.move_in_date
+    available: date | None = listing.available_from
+
+    if move_in is None or available is None:
+        return int(round(weight * 0.6)), "Move-in timing not specified on one side."
+    late_days = (available - move_in).days
+    if late_days <= 0:
+        return weight, "Available by your move-in date."
+    score = int(round(weight * max(0.0, 1 - late_days / MOVE_IN_GRACE_DAYS)))
+    return score, f"Available {late_days} days after your move-in date."
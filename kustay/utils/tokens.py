@@ -0,0 +1,84 @@
+"""
+Hashed single-use tokens for e-mail verification and password reset.
+
+The raw token only ever exists in the e-mailed link. The database keeps its
+SHA-256, so checking a token is a unique-index lookup that also enforces the
+purpose, the expiry and single use.
+"""
+from __future__ import annotations
+
+import hashlib
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import UserToken
+
+Purpose = UserToken.Purpose
+
+
+def token_ttl(purpose: str) -> timedelta:
+    if purpose == Purpose.PASSWORD_RESET:
+        return timedelta(seconds=settings.PASSWORD_RESET_TOKEN_TTL)
+    return timedelta(seconds=settings.VERIFY_EMAIL_TOKEN_TTL)
+
+
+def hash_token(raw_token: str) -> str:
+    return hashlib.sha256(raw_token.encode()).hexdigest()
+
+
+def issue_token(user, purpose: str, replace: bool = True) -> str:
+    """
+    Creates a token for ``user`` and returns the raw value to e-mail.
+    Earlier unused tokens for the same purpose stop working; pass
+    ``replace=False`` for users that cannot have any yet.
+    """
+    if replace:
+        UserToken.objects.filter(user=user, purpose=purpose, used_at__isnull=True).delete()
+    raw_token = secrets.token_urlsafe(32)
+    UserToken.objects.create(
+        user=user,
+        purpose=purpose,
+        token_hash=hash_token(raw_token),
+        expires_at=timezone.now() + token_ttl(purpose),
+    )
+    return raw_token
+
+
+def token_lookup(raw_token: str, purpose: str):
+    """Queryset matching a live token (at most one row, by unique index)."""
+    return UserToken.objects.filter(
+        token_hash=hash_token(raw_token),
+        purpose=purpose,
+        used_at__isnull=True,
+        expires_at__gt=timezone.now(),
+    )
+
+
+def consume_token(raw_token: str | None, purpose: str):
+    """
+    Marks a live token used and returns its user, or ``None`` if the token is
+    unknown, expired, already used or meant for another purpose.
+    """
+    if not raw_token:
+        return None
+    token = token_lookup(raw_token, purpose).select_related("user").first()
+    if token is None:
+        return None
+    # Conditional so two concurrent requests cannot both use the token.
+    claimed = UserToken.objects.filter(pk=token.pk, used_at__isnull=True).update(
+        used_at=timezone.now()
+    )
+    return token.user if claimed else None
+
+
+def purge_tokens(used_older_than: timedelta = timedelta(days=1)) -> int:
+    """Deletes expired tokens and tokens used more than ``used_older_than`` ago."""
+    now = timezone.now()
+    deleted, _ = UserToken.objects.filter(
+        Q(expires_at__lte=now) | Q(used_at__lte=now - used_older_than)
+    ).delete()
+    return deleted
@@ -0,0 +1,54 @@
+"""
+Cross-request cache of authenticated users with their profile.
+
+Entries are keyed by a per-user version number that is bumped whenever the
+user or their profile is saved or deleted, so a stale copy is never served
+once the change has committed. Only used with a shared cache backend
+(``USER_CACHE_ENABLED``), so every process sees the version bump.
+"""
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+VERSION_CACHE_KEY = "kustay:user-version:{user_id}"
+USER_CACHE_KEY = "kustay:user:{user_id}:{version}"
+
+
+def _cache():
+    return caches[getattr(settings, "USER_CACHE_ALIAS", "default")]
+
+
+def _version(cache, user_id) -> int:
+    key = VERSION_CACHE_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        # A fresh number so an evicted version never revives an older entry.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_cached_user(user_id):
+    """The user with ``profile`` preloaded, or ``None`` if it does not exist."""
+    cache = _cache()
+    key = USER_CACHE_KEY.format(user_id=user_id, version=_version(cache, user_id))
+    user = cache.get(key)
+    if user is None:
+        user = get_user_model()._default_manager.select_related("profile").filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(key, user, timeout=settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_cached_user(user_id) -> None:
+    cache = _cache()
+    key = VERSION_CACHE_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
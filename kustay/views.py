@@ -1,20 +1,29 @@
+import asyncio
 from decimal import Decimal, InvalidOperation
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, get_user_model, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
 from django.db.models import Q
-from django.shortcuts import get_object_or_404, redirect, render
-from django.utils import timezone
-
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
-from rest_framework.views import APIView
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
+from django.utils.cache import patch_cache_control
+from django.views import View
+from django.views.static import serve
 
 from .forms import ListingForm, MessageForm, ProfileForm
-from .models import Conversation, Listing, MatchCompatibility, Message, Profile
-from .utils.matching import calculate_matches_for_user
+from .models import Conversation, Listing, Message, Notification, Profile
+from .storage import is_content_addressed
+from .utils.blocking import get_blocked_index
+from .utils.events import format_sse, get_event_backend, publish_event
+from .utils.matching import calculate_matches_for_user, get_top_matches
+from .utils.message_archive import THREAD_PAGE_SIZE, latest_messages, thread_page
+from .utils.notifications import NotificationEvent, notify
+from .utils.ratelimit import LOGIN_LIMITS, ratelimit
+from .utils.read_state import mark_conversation_read, unread_counts
 
 
 def home_view(request):
@@ -27,7 +36,27 @@ def home_view(request):
     )
 
 
-def listing_list_view(request):
+def media_view(request, path, document_root=None, show_indexes=False):
+    """
+    Development media server. Content-addressed files never change under their
+    URL, so browsers and CDNs may cache them forever.
+    """
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    if is_content_addressed(path):
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.MEDIA_IMMUTABLE_MAX_AGE,
+            immutable=True,
+        )
+    return response
+
+
+async def listing_list_view(request):
+    """
+    Runs natively under ASGI: the queryset is evaluated with ``async for``
+    before rendering, so no worker thread is held while the database answers.
+    """
     listings = Listing.objects.filter(is_active=True).select_related("user")
 
     location = request.GET.get("location", "").strip()
@@ -68,7 +97,9 @@ def listing_list_view(request):
         request,
         "listings.html",
         {
-            "listings": listings,
+            # Passed explicitly: the lazy request.user cannot load in async code.
+            "user": await request.auser(),
+            "listings": [listing async for listing in listings],
             "filters": {
                 "location": location,
                 "price_min": price_min,
@@ -80,8 +111,8 @@ def listing_list_view(request):
     )
 
 
-def listing_detail_view(request, listing_id):
-    listing = get_object_or_404(
+async def listing_detail_view(request, listing_id):
+    listing = await aget_object_or_404(
         Listing.objects.select_related("user"),
         pk=listing_id,
     )
@@ -89,6 +120,7 @@ def listing_detail_view(request, listing_id):
         request,
         "listing_detail.html",
         {
+            "user": await request.auser(),
             "listing": listing,
         },
     )
@@ -157,6 +189,7 @@ def listing_delete_view(request, listing_id):
     )
 
 
+@ratelimit("login", LOGIN_LIMITS)
 def login_view(request):
     if request.user.is_authenticated:
         return redirect("home")
@@ -224,17 +257,18 @@ def conversation_list_view(request):
         .order_by("-last_message_at", "-created_at")
     )
 
+    conversations = list(conversations)
+    unread = unread_counts(request.user)
+    last_messages = latest_messages(convo.pk for convo in conversations)
     items = []
     for convo in conversations:
         partner = convo.user2 if convo.user1_id == request.user.pk else convo.user1
-        last_message = (
-            convo.messages.select_related("sender").order_by("-sent_at").first()
-        )
         items.append(
             {
                 "conversation": convo,
                 "partner": partner,
-                "last_message": last_message,
+                "last_message": last_messages.get(convo.pk),
+                "unread": unread.get(convo.pk, 0),
             }
         )
 
@@ -255,11 +289,16 @@ def conversation_start_view(request, user_id):
         messages.error(request, "You cannot start a conversation with yourself.")
         return redirect("conversations")
 
+    if get_blocked_index(request.user.pk).is_blocked(request.user.pk, other_user.pk):
+        messages.error(request, "You cannot message this user.")
+        return redirect("conversations")
+
     conversation = _get_or_create_conversation(request.user, other_user)
     return redirect("conversation_detail", conversation_id=conversation.pk)
 
 
 @login_required
+@ratelimit("message-send", [("user", "30/m")])
 def conversation_detail_view(request, conversation_id):
     conversation = get_object_or_404(
         Conversation.objects.select_related("user1", "user2"),
@@ -271,12 +310,10 @@ def conversation_detail_view(request, conversation_id):
 
     partner = conversation.user2 if conversation.user1_id == request.user.pk else conversation.user1
 
-    conversation.messages.filter(
-        receiver=request.user,
-        is_read=False,
-    ).update(is_read=True, read_at=timezone.now())
-
     if request.method == "POST":
+        if get_blocked_index(request.user.pk).is_blocked(request.user.pk, partner.pk):
+            messages.error(request, "You cannot message this user.")
+            return redirect("conversation_detail", conversation_id=conversation.pk)
         form = MessageForm(request.POST)
         if form.is_valid():
             message = form.save(commit=False)
@@ -286,13 +323,33 @@ def conversation_detail_view(request, conversation_id):
             message.save()
             conversation.last_message_at = message.sent_at
             conversation.save(update_fields=["last_message_at"])
+            publish_event(partner.pk, "unread", {"conversation_id": conversation.pk, "delta": 1})
+            notify([
+                NotificationEvent(
+                    user_id=partner.pk,
+                    notification_type=Notification.NotificationType.MESSAGE,
+                    content=f"New message from {request.user.get_full_name() or request.user.username}",
+                    related_id=conversation.pk,
+                )
+            ])
             messages.success(request, "Message sent.")
             return redirect("conversation_detail", conversation_id=conversation.pk)
         messages.error(request, "Please correct the errors below.")
     else:
         form = MessageForm()
 
-    messages_qs = conversation.messages.select_related("sender").order_by("sent_at")
+    before = request.GET.get("before")
+    before = int(before) if before and before.isdigit() else None
+    page = thread_page(conversation, before=before)
+    if before is None:
+        mark_conversation_read(
+            conversation,
+            request.user,
+            max(
+                (message.pk for message in page if message.receiver_id == request.user.pk),
+                default=None,
+            ),
+        )
 
     return render(
         request,
@@ -300,7 +357,8 @@ def conversation_detail_view(request, conversation_id):
         {
             "conversation": conversation,
             "partner": partner,
-            "messages": messages_qs,
+            "messages": page[::-1],
+            "older_before": page[-1].pk if len(page) == THREAD_PAGE_SIZE else None,
             "form": form,
         },
     )
@@ -323,28 +381,16 @@ def matches_view(request):
     # Ensure the requesting user has fresh scores before rendering.
     calculate_matches_for_user(request.user)
 
-    matches_qs = (
-        MatchCompatibility.objects.filter(
-            Q(user1=request.user, user2__is_verified=True, user2__profile__isnull=False)
-            | Q(
-                user2=request.user,
-                user1__is_verified=True,
-                user1__profile__isnull=False,
-            )
-        )
-        .select_related("user1__profile", "user2__profile")
-        .order_by("-compatibility_score", "-calculated_at")[:20]
-    )
-
     display_matches = []
-    for match in matches_qs:
-        partner = match.user2 if match.user1_id == request.user.pk else match.user1
+    for directed in get_top_matches(request.user, limit=20):
+        partner = directed.partner
         display_matches.append(
             {
+                "match_id": directed.match_id,
                 "user": partner,
                 "profile": getattr(partner, "profile", None),
-                "score": int(match.compatibility_score),
-                "criteria": match.matching_criteria or {},
+                "score": int(directed.compatibility_score),
+                "criteria": directed.match.matching_criteria or {},
             }
         )
 
@@ -354,51 +400,48 @@ def matches_view(request):
         {
             "user": request.user,
             "matches": display_matches,
+            # Scores and breakdowns only change with either profile, so cards
+            # are cached per profile version (calculated_at moves on every visit).
+            "profile_updated_at": user_profile.updated_at,
         },
     )
 
 
-class TopMatchesAPIView(APIView):
-    permission_classes = [IsAuthenticated]
+class TopMatchesAPIView(View):
+    """
+    Async JSON endpoint (DRF views are sync-only). Same payload and error
+    responses as the DRF endpoints around it.
+    """
 
-    def get(self, request):
-        user = request.user
-        try:
-            user_profile = user.profile
-        except Profile.DoesNotExist:
-            user_profile = None
+    http_method_names = ["get"]
+
+    async def get(self, request):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."},
+                status=403,
+            )
 
-        if not user.is_verified or user_profile is None:
-            return Response(
+        has_profile = await Profile.objects.filter(user_id=user.pk).aexists()
+        if not user.is_verified or not has_profile:
+            return JsonResponse(
                 {
                     "detail": "Verified profile required to view matches.",
                 },
                 status=400,
             )
 
-        calculate_matches_for_user(user)
+        await sync_to_async(calculate_matches_for_user)(user)
 
         try:
-            limit = max(1, min(int(request.query_params.get("limit", 20)), 50))
+            limit = max(1, min(int(request.GET.get("limit", 20)), 50))
         except (TypeError, ValueError):
             limit = 20
 
-        matches_qs = (
-            MatchCompatibility.objects.filter(
-                Q(user1=user, user2__is_verified=True, user2__profile__isnull=False)
-                | Q(
-                    user2=user,
-                    user1__is_verified=True,
-                    user1__profile__isnull=False,
-                )
-            )
-            .select_related("user1__profile", "user2__profile")
-            .order_by("-compatibility_score", "-calculated_at")[:limit]
-        )
-
         results = []
-        for match in matches_qs:
-            partner = match.user2 if match.user1_id == user.pk else match.user1
+        async for directed in get_top_matches(user, limit=limit):
+            partner = directed.partner
             partner_profile = getattr(partner, "profile", None)
             results.append(
                 {
@@ -409,9 +452,54 @@ class TopMatchesAPIView(APIView):
                         "department": getattr(partner_profile, "department", ""),
                         "faculty": getattr(partner_profile, "faculty", ""),
                     },
-                    "compatibility_score": float(match.compatibility_score),
-                    "matching_criteria": match.matching_criteria or {},
+                    "compatibility_score": float(directed.compatibility_score),
+                    "matching_criteria": directed.match.matching_criteria or {},
                 }
             )
 
-        return Response({"results": results, "count": len(results)})
+        return JsonResponse({"results": results, "count": len(results)})
+
+
+async def event_stream_view(request):
+    """
+    Server-sent events for the logged-in user: a snapshot of unread counts,
+    then notification and unread-count deltas as they happen. Serve through
+    ``config.asgi`` so idle streams do not each hold a thread.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+
+    backend = get_event_backend()
+    backend.start()
+    snapshot = await sync_to_async(_event_snapshot)(user)
+
+    async def stream():
+        subscription = backend.broker.subscribe(user.pk)
+        try:
+            yield format_sse("snapshot", snapshot)
+            while True:
+                try:
+                    item = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if item is None:  # Closed by the server.
+                    return
+                yield format_sse(*item)
+        finally:
+            backend.broker.unsubscribe(user.pk, subscription)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _event_snapshot(user):
+    return {
+        "unread_messages": unread_counts(user),
+        "unread_notifications": Notification.objects.filter(user=user, is_read=False).count(),
+    }